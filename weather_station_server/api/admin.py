@@ -1,10 +1,25 @@
 from django.contrib import admin
 
+from . import response_cache
 from .models import Employee, EmployeeCard, EmployeeCardLog, WeatherStation, WeatherData, WorkTime, WorkSpace
 
-admin.site.register(EmployeeCardLog)
+
+class ResponseCacheAdmin(admin.ModelAdmin):
+    """Readings and card logs send no post_delete signal (see signals.py), deletes invalidate here."""
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        response_cache.invalidate(type(obj), [obj])
+
+    def delete_queryset(self, request, queryset):
+        deleted = list(queryset)
+        super().delete_queryset(request, queryset)
+        response_cache.invalidate(queryset.model, deleted)
+
+
+admin.site.register(EmployeeCardLog, ResponseCacheAdmin)
 admin.site.register(WeatherStation)
-admin.site.register(WeatherData)
+admin.site.register(WeatherData, ResponseCacheAdmin)
 admin.site.register(WorkSpace)
 
 @admin.register(WorkTime)
@@ -29,6 +44,11 @@ class CardAdmin(admin.ModelAdmin):
     list_display = ('card_number', 'employee')
     search_fields = ['card_number', 'employee__name', 'employee__surname']
 
+    def save_formset(self, request, form, formset, change):
+        super().save_formset(request, form, formset, change)
+        if formset.model is EmployeeCardLog and formset.deleted_objects:
+            response_cache.invalidate(EmployeeCardLog, formset.deleted_objects)
+
 @admin.register(Employee)
 class EmployeeAdmin(admin.ModelAdmin):
     inlines = [WorkTimeInline, EmployeeCardInline]
@@ -0,0 +1,102 @@
+"""
+Time-bucket aggregation of weather data, read from the minute, hourly and daily rollups
+(see rollups.py) instead of the raw readings. Week and month buckets are summed from the
+daily rollups. Buckets are aligned to TIME_ZONE, so a "day" bucket starts at local midnight.
+The rollups outlive the raw readings (see retention.py).
+"""
+
+from django.db.models import Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncMinute, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import WeatherDataDaily, WeatherDataHourly, WeatherDataMinute
+
+METRICS = ("temperature", "humidity", "pressure")
+
+BUCKETS = {
+    "minute": TruncMinute,
+    "hour": TruncHour,
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+ROLLUP_MODELS = {
+    "minute": WeatherDataMinute,
+    "hour": WeatherDataHourly,
+    "day": WeatherDataDaily,
+}
+
+# Rollup period each bucket is computed from.
+ROLLUP_PERIODS = {
+    "minute": "minute",
+    "hour": "hour",
+    "day": "day",
+    "week": "day",
+    "month": "day",
+}
+
+BUCKET_ALIASES = {
+    "1m": "minute",
+    "1h": "hour",
+    "1d": "day",
+    "1w": "week",
+    "1mo": "month",
+}
+
+
+def bucket_start(date, period):
+    """Truncates a datetime to the start of its minute, hour or day in TIME_ZONE, like Trunc* does in SQL."""
+    date = timezone.localtime(date, timezone.get_default_timezone())
+    date = date.replace(second=0, microsecond=0)
+    if period in ("hour", "day"):
+        date = date.replace(minute=0)
+    if period == "day":
+        date = date.replace(hour=0)
+    return date
+
+
+def resolve_bucket(value):
+    """Returns the canonical bucket name, or None if the value is not a known bucket."""
+    bucket = BUCKET_ALIASES.get(value, value)
+    return bucket if bucket in BUCKETS else None
+
+
+def aggregate_rollups(weather_station, bucket, start=None, end=None):
+    """
+    Returns count and min/max/avg of every metric per bucket, oldest bucket first.
+    The range selects whole buckets: every bucket that overlaps start and starts before end.
+    """
+    period = ROLLUP_PERIODS[bucket]
+    rollups = ROLLUP_MODELS[period].objects.filter(weather_station=weather_station)
+    if start is not None:
+        rollups = rollups.filter(bucket__gte=bucket_start(start, period))
+    if end is not None:
+        rollups = rollups.filter(bucket__lte=end)
+    aggregates = {"count": Sum("count")}
+    for metric in METRICS:
+        aggregates[f"{metric}_sum"] = Sum(f"{metric}_sum")
+        aggregates[f"{metric}_min"] = Min(f"{metric}_min")
+        aggregates[f"{metric}_max"] = Max(f"{metric}_max")
+    trunc = BUCKETS[bucket]("bucket", tzinfo=timezone.get_default_timezone())
+    rows = (
+        rollups.annotate(group=trunc)
+        .values("group")
+        .annotate(**aggregates)
+        .order_by("group")
+    )
+    return [
+        {
+            "bucket": row["group"],
+            "count": row["count"],
+            **{
+                metric: {
+                    "min": row[f"{metric}_min"],
+                    "max": row[f"{metric}_max"],
+                    "avg": row[f"{metric}_sum"] / row["count"],
+                }
+                for metric in METRICS
+            },
+        }
+        for row in rows
+    ]
@@ -0,0 +1,58 @@
+"""
+Versioned allowlist of card numbers for card readers that authorize offline.
+A card is allowed when it is active and its employee, if any, is active too.
+Versions come from the "cardallowlist" DataVersion counter, which is bumped in the
+transaction that records the change. The counter row stays locked until that
+transaction commits, so versions become visible in order and a reader polling with
+since never skips a change that commits late.
+"""
+
+from django.db import transaction
+from django.db.models import Min, Q
+
+from .conditional import bump_version, get_version
+from .models import CardAllowlistChange, EmployeeCard
+
+VERSION_NAME = "cardallowlist"
+
+ALLOWED_CARDS = Q(is_active=True) & (Q(employee=None) | Q(employee__is_active=True))
+
+
+def allowed_card_numbers():
+    return EmployeeCard.objects.filter(ALLOWED_CARDS).values_list("card_number", flat=True)
+
+
+def is_allowed(card_is_active, employee_is_active):
+    return bool(card_is_active) and employee_is_active is not False
+
+
+def current_version():
+    return get_version(VERSION_NAME)[0]
+
+
+def record_change(card_number, allowed):
+    with transaction.atomic():
+        bump_version(VERSION_NAME)
+        CardAllowlistChange.objects.create(
+            version=current_version(), card_number=card_number, is_allowed=allowed
+        )
+
+
+def get_delta(since):
+    """
+    Returns (added, removed) card numbers changed after the given version, or None when
+    the history since that version is no longer available or the version is unknown,
+    e.g. newer than the current one after the database was restored.
+    """
+    if since < 0 or since > current_version():
+        return None
+    oldest = CardAllowlistChange.objects.aggregate(version=Min("version"))["version"]
+    if oldest is not None and since < oldest - 1:
+        return None
+    latest = {}
+    changes = CardAllowlistChange.objects.filter(version__gt=since).order_by("version")
+    for card_number, allowed in changes.values_list("card_number", "is_allowed"):
+        latest[card_number] = allowed
+    added = sorted(number for number, allowed in latest.items() if allowed)
+    removed = sorted(number for number, allowed in latest.items() if not allowed)
+    return added, removed
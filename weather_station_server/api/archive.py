@@ -0,0 +1,266 @@
+"""
+Compressed columnar archive of old weather data.
+The archive_weather_data command moves readings older than WEATHER_ARCHIVE["AGE_DAYS"]
+out of WeatherData into one file per station and month: a delta-of-delta timestamp
+column and one Gorilla encoded column per metric (see gorilla.py).
+WeatherDataArchive rows index the files, the weather data read paths merge archived
+and live readings. Archived readings get a stable id derived from the station, the
+timestamp and their position among readings with the same timestamp.
+"""
+
+import functools
+import struct
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+
+from . import response_cache, sharding
+from .aggregation import METRICS
+from .gorilla import decode_timestamps, decode_values, encode_timestamps, encode_values
+from .models import WeatherData, WeatherDataArchive, WeatherStation
+from .streaming import WEATHER_DATA_COLUMNS
+
+MAGIC = b"WSA1"
+HEADER = struct.Struct(">4sI")
+COLUMN_HEADER = struct.Struct(">I")
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+ARCHIVED_ID_NAMESPACE = uuid.UUID("5b0c7a4e-2f6d-4f1b-9a43-7d1f0f3c2e91")
+DATE_COLUMN = WEATHER_DATA_COLUMNS.index("date")
+DELETE_BATCH_SIZE = 500
+# Seconds a replaced archive file is kept, requests that looked it up before may still read it.
+ORPHAN_GRACE_PERIOD = 3600
+
+
+def archive_path(file_name):
+    return Path(settings.WEATHER_ARCHIVE["PATH"]) / file_name
+
+
+def to_microseconds(date):
+    return (date - EPOCH) // timedelta(microseconds=1)
+
+
+def from_microseconds(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def month_start(date):
+    return date.astimezone(dt_timezone.utc).date().replace(day=1)
+
+
+def next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def encode_archive(readings):
+    """Encodes (date, temperature, humidity, pressure) tuples, oldest first."""
+    columns = [encode_timestamps([to_microseconds(reading[0]) for reading in readings])]
+    for index in range(1, len(METRICS) + 1):
+        columns.append(encode_values([reading[index] for reading in readings]))
+    return HEADER.pack(MAGIC, len(readings)) + b"".join(
+        COLUMN_HEADER.pack(len(column)) + column for column in columns
+    )
+
+
+def decode_archive(data):
+    """Returns the timestamps in microseconds and the list of every metric column."""
+    magic, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a weather data archive")
+    offset = HEADER.size
+    columns = []
+    for _ in range(len(METRICS) + 1):
+        (length,) = COLUMN_HEADER.unpack_from(data, offset)
+        offset += COLUMN_HEADER.size
+        columns.append(data[offset : offset + length])
+        offset += length
+    return decode_timestamps(columns[0], count), [decode_values(column, count) for column in columns[1:]]
+
+
+def archived_id(weather_station_id, timestamp, occurrence):
+    return uuid.uuid5(ARCHIVED_ID_NAMESPACE, f"{weather_station_id}:{timestamp}:{occurrence}")
+
+
+@functools.lru_cache(maxsize=32)
+def read_archive_rows(file_name, weather_station_id):
+    """
+    Returns the readings of an archive file as WEATHER_DATA_COLUMNS tuples, oldest first.
+    A file is never rewritten, a new version gets a new name, so the result is cached by name.
+    """
+    timestamps, (temperature, humidity, pressure) = decode_archive(archive_path(file_name).read_bytes())
+    rows = []
+    previous, occurrence = None, 0
+    for index, timestamp in enumerate(timestamps):
+        occurrence = occurrence + 1 if timestamp == previous else 0
+        previous = timestamp
+        rows.append(
+            (
+                archived_id(weather_station_id, timestamp, occurrence),
+                weather_station_id,
+                temperature[index],
+                humidity[index],
+                pressure[index],
+                from_microseconds(timestamp),
+            )
+        )
+    return tuple(rows)
+
+
+def iter_archived(weather_station_id=None, start=None, end=None, descending=True, after=None):
+    """
+    Yields archived readings as WEATHER_DATA_COLUMNS tuples ordered by (date, id), newest first
+    unless descending is False. start and end are inclusive bounds, after is a (date, id)
+    keyset position to continue from. Files are only read when the iteration reaches them.
+    """
+    archives = WeatherDataArchive.objects.all()
+    if weather_station_id is not None:
+        archives = archives.filter(weather_station_id=weather_station_id)
+    if start is not None:
+        archives = archives.filter(end_date__gte=start)
+    if end is not None:
+        archives = archives.filter(start_date__lte=end)
+    if after is not None:
+        if descending:
+            archives = archives.filter(start_date__lte=after[0])
+        else:
+            archives = archives.filter(end_date__gte=after[0])
+    archives = archives.order_by("-month" if descending else "month").values_list(
+        "month", "file_name", "weather_station_id"
+    )
+
+    def key(row):
+        return (row[DATE_COLUMN], row[0])
+
+    def selected(row):
+        if start is not None and row[DATE_COLUMN] < start:
+            return False
+        if end is not None and row[DATE_COLUMN] > end:
+            return False
+        if after is not None:
+            return key(row) < after if descending else key(row) > after
+        return True
+
+    # Files of the same month cover the same time window, so only a month needs sorting.
+    for _, month_archives in groupby(archives, key=itemgetter(0)):
+        rows = [
+            row
+            for _, file_name, station_id in month_archives
+            for row in read_archive_rows(file_name, station_id)
+            if selected(row)
+        ]
+        rows.sort(key=key, reverse=descending)
+        yield from rows
+
+
+def as_values(rows):
+    """Turns archived tuples into dicts like WeatherData.objects.values(*WEATHER_DATA_COLUMNS)."""
+    for row in rows:
+        yield dict(zip(WEATHER_DATA_COLUMNS, row))
+
+
+def archive_weather_data(before, weather_station=None):
+    """
+    Moves the readings older than before into the archive, one station and month at a time.
+    Returns the number of readings archived and the size of the files written.
+    """
+    stations = WeatherStation.objects.all()
+    if weather_station is not None:
+        stations = stations.filter(id=weather_station.id)
+    archived = written = 0
+    for station_id in stations.values_list("id", flat=True):
+        while True:
+            oldest = sharding.weather_data(station_id).filter(
+                weather_station_id=station_id, date__lt=before
+            ).aggregate(date=Min("date"))["date"]
+            if oldest is None:
+                break
+            month = month_start(oldest)
+            month_end = datetime.combine(next_month(month), datetime.min.time(), dt_timezone.utc)
+            readings = list(
+                sharding.weather_data(station_id).filter(
+                    weather_station_id=station_id,
+                    date__gte=oldest,
+                    date__lt=min(month_end, before),
+                )
+                .order_by("date")
+                .values_list("id", "date", *METRICS)
+            )
+            written += archive_month(station_id, month, readings)
+            archived += len(readings)
+    remove_orphaned_files()
+    return archived, written
+
+
+def archive_month(weather_station_id, month, readings):
+    """Adds (id, date, *METRICS) readings to the month's archive file and deletes their rows."""
+    archive = WeatherDataArchive.objects.filter(weather_station_id=weather_station_id, month=month).first()
+    merged = []
+    if archive is not None:
+        merged += [
+            (row[DATE_COLUMN], *row[2 : 2 + len(METRICS)])
+            for row in read_archive_rows(archive.file_name, weather_station_id)
+        ]
+    # Archived readings stay in front of new ones with the same timestamp: the sort is stable,
+    # so they keep their position among those readings and with it their id.
+    merged += [row[1:] for row in readings]
+    merged.sort(key=itemgetter(0))
+    data = encode_archive(merged)
+    file_name = f"{weather_station_id}/{month:%Y-%m}-{uuid.uuid4().hex[:8]}.wsa"
+    path = archive_path(file_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    ids = [row[0] for row in readings]
+    try:
+        alias = sharding.shard_for(weather_station_id)
+        with transaction.atomic(), transaction.atomic(using=alias, savepoint=False):
+            WeatherDataArchive.objects.update_or_create(
+                weather_station_id=weather_station_id,
+                month=month,
+                defaults={
+                    "start_date": merged[0][0],
+                    "end_date": merged[-1][0],
+                    "count": len(merged),
+                    "file_name": file_name,
+                    "size": len(data),
+                },
+            )
+            for index in range(0, len(ids), DELETE_BATCH_SIZE):
+                # Readings send no delete signals (see signals.py), the response cache is
+                # invalidated below.
+                WeatherData.objects.using(alias).filter(
+                    id__in=ids[index : index + DELETE_BATCH_SIZE]
+                ).delete()
+            response_cache.invalidate(
+                WeatherData, [WeatherData(weather_station_id=weather_station_id, date=merged[0][0])]
+            )
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    if archive is not None:
+        # The grace period of the replaced file starts now, see remove_orphaned_files.
+        archive_path(archive.file_name).touch()
+    return len(data)
+
+
+def remove_orphaned_files(grace_period=ORPHAN_GRACE_PERIOD):
+    """
+    Removes archive files that no WeatherDataArchive row references any more and that were
+    not touched during the grace period, a request may still be reading a replaced file.
+    """
+    root = archive_path("")
+    if not root.is_dir():
+        return 0
+    referenced = set(WeatherDataArchive.objects.values_list("file_name", flat=True))
+    removed = 0
+    for path in root.glob("*/*.wsa"):
+        file_name = path.relative_to(root).as_posix()
+        if file_name not in referenced and path.stat().st_mtime < time.time() - grace_period:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
@@ -0,0 +1,131 @@
+"""
+Native async versions of the device-facing endpoints.
+They use the async ORM so a single ASGI worker can keep thousands of slow
+device connections open without holding a thread for each of them.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from .models import EmployeeCard, EmployeeCardLog, WeatherData, WeatherStation
+from .ingest import save_weather_data
+from .serializers import WeatherDataUnboundAddSerializer
+from . import work_time, write_behind
+from .auth_cache import auth_cache
+
+NOT_FOUND = {"detail": "Not found."}
+
+
+def request_data(request):
+    """Returns the request payload for both JSON and form encoded bodies."""
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+async def get_active_station(station_id):
+    try:
+        return await WeatherStation.objects.aget(id=station_id, is_active=True)
+    except (WeatherStation.DoesNotExist, ValidationError, ValueError):
+        return None
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncCheckEmployeeCardView(View):
+    """Checks if the card is active and saves the log entry."""
+
+    async def post(self, request):
+        data = request_data(request)
+        if "card_number" not in data:
+            return JsonResponse({"status": "ERROR"}, status=400)
+        weather_station_id = None
+        if "weather_station" in data:
+            weather_station_id = data["weather_station"]
+            if not await auth_cache.ais_active_station(weather_station_id):
+                return JsonResponse({"status": "ERROR"}, status=401)
+        employee_card = await auth_cache.aget_card(data["card_number"])
+        if employee_card is None:
+            return JsonResponse(NOT_FOUND, status=404)
+        if not employee_card.is_active:
+            return JsonResponse({"status": "ERROR - card is inactive"}, status=403)
+        employee_card_log = EmployeeCardLog(
+            employee_card_id=employee_card.id,
+            date=timezone.now(),
+            weather_station_id=weather_station_id,
+        )
+        if write_behind.is_enabled():
+            if not write_behind.buffer.append(employee_card_log):
+                return JsonResponse(write_behind.BUSY, status=503)
+        else:
+            await employee_card_log.asave()
+        return JsonResponse({"status": "OK"}, status=200)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncHandleWorkTimeView(View):
+    """Handles work time."""
+
+    async def post(self, request):
+        data = request_data(request)
+        if "card_number" not in data:
+            return JsonResponse({"status": "ERROR - Provide card_number"}, status=400)
+        weather_station = await get_active_station(data.get("weather_station"))
+        if weather_station is None:
+            return JsonResponse({"status": "ERROR - Invalid work_station id"}, status=401)
+        try:
+            employee_card = await EmployeeCard.objects.aget(card_number=data["card_number"])
+        except EmployeeCard.DoesNotExist:
+            return JsonResponse(NOT_FOUND, status=404)
+        if not employee_card.is_active:
+            return JsonResponse({"status": "ERROR - Employee card is inactive!"}, status=401)
+        if employee_card.employee_id is None:
+            return JsonResponse({"status": "ERROR - Employee card has no employee!"}, status=404)
+        message, code = await sync_to_async(work_time.handle_swipe)(
+            employee_card.employee_id, weather_station
+        )
+        return JsonResponse({"status": message}, status=code)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncSendWeatherDataApiView(View):
+    """Saves weather data."""
+
+    async def post(self, request):
+        serializer = WeatherDataUnboundAddSerializer(data=request_data(request))
+        if not serializer.is_valid():
+            return JsonResponse({"status": "ERROR", "errors": serializer.errors}, status=400)
+        station_id = serializer.validated_data["weather_station"]
+        if not await WeatherStation.objects.filter(id=station_id).aexists():
+            return JsonResponse(
+                {
+                    "status": "ERROR",
+                    "errors": {
+                        "weather_station": [f'Invalid pk "{station_id}" - object does not exist.']
+                    },
+                },
+                status=400,
+            )
+        weather_data = WeatherData(
+            weather_station_id=station_id,
+            temperature=serializer.validated_data["temperature"],
+            humidity=serializer.validated_data["humidity"],
+            pressure=serializer.validated_data["pressure"],
+            date=timezone.now(),
+        )
+        if write_behind.is_enabled():
+            if not write_behind.buffer.append(weather_data):
+                return JsonResponse(write_behind.BUSY, status=503)
+        else:
+            await sync_to_async(save_weather_data)([weather_data])
+        return JsonResponse({"status": "OK"}, status=200)
@@ -0,0 +1,196 @@
+"""
+Caches the card and station lookups done on every card swipe.
+Entries are invalidated by model signals (see signals.py) and expire after
+TIMEOUT seconds, which bounds staleness for workers that did not see the change.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import EmployeeCard, WeatherStation
+
+CardAuthorization = namedtuple("CardAuthorization", ("id", "is_active"))
+
+MISSING = object()
+UNKNOWN_CARD = "unknown"
+
+
+class LRUCache:
+    """Thread-safe in-process cache with a bounded size and per-entry expiry."""
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, MISSING)
+            if entry is MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedCache:
+    """Stores entries in a Django cache so every worker sees the same state."""
+
+    def __init__(self, alias, timeout):
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, key, default=None):
+        return self.cache.get(key, default)
+
+    async def aget(self, key, default=None):
+        return await self.cache.aget(key, default)
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    async def aset(self, key, value):
+        await self.cache.aset(key, value, self.timeout)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class AuthorizationCache:
+    """Card and active station lookups for the swipe endpoints."""
+
+    def __init__(self, store):
+        self.store = store
+        self.shared = isinstance(store, SharedCache)
+
+    @staticmethod
+    def card_key(card_number):
+        return f"card_auth:card:{card_number}"
+
+    @staticmethod
+    def station_key(station_id):
+        return f"card_auth:station:{station_id}"
+
+    def get_card(self, card_number):
+        """Returns a CardAuthorization, or None if the card does not exist."""
+        key = self.card_key(card_number)
+        card = self.store.get(key, MISSING)
+        if card is MISSING:
+            card = self._load_card(card_number)
+            self.store.set(key, card)
+        return None if card == UNKNOWN_CARD else card
+
+    async def aget_card(self, card_number):
+        key = self.card_key(card_number)
+        card = await self._aget(key)
+        if card is MISSING:
+            try:
+                card = CardAuthorization(
+                    *await EmployeeCard.objects.values_list("id", "is_active").aget(
+                        card_number=card_number
+                    )
+                )
+            except EmployeeCard.DoesNotExist:
+                card = UNKNOWN_CARD
+            await self._aset(key, card)
+        return None if card == UNKNOWN_CARD else card
+
+    def is_active_station(self, station_id):
+        station_id = self._normalize_station_id(station_id)
+        if station_id is None:
+            return False
+        key = self.station_key(station_id)
+        is_active = self.store.get(key, MISSING)
+        if is_active is MISSING:
+            is_active = WeatherStation.objects.filter(id=station_id, is_active=True).exists()
+            self.store.set(key, is_active)
+        return is_active
+
+    async def ais_active_station(self, station_id):
+        station_id = self._normalize_station_id(station_id)
+        if station_id is None:
+            return False
+        key = self.station_key(station_id)
+        is_active = await self._aget(key)
+        if is_active is MISSING:
+            is_active = await WeatherStation.objects.filter(id=station_id, is_active=True).aexists()
+            await self._aset(key, is_active)
+        return is_active
+
+    def invalidate_card(self, card_number):
+        self.store.delete(self.card_key(card_number))
+
+    def invalidate_station(self, station_id):
+        self.store.delete(self.station_key(station_id))
+
+    def clear(self):
+        self.store.clear()
+
+    def _load_card(self, card_number):
+        try:
+            return CardAuthorization(
+                *EmployeeCard.objects.values_list("id", "is_active").get(card_number=card_number)
+            )
+        except EmployeeCard.DoesNotExist:
+            return UNKNOWN_CARD
+
+    async def _aget(self, key):
+        if self.shared:
+            return await self.store.aget(key, MISSING)
+        return self.store.get(key, MISSING)
+
+    async def _aset(self, key, value):
+        if self.shared:
+            await self.store.aset(key, value)
+        else:
+            self.store.set(key, value)
+
+    @staticmethod
+    def _normalize_station_id(station_id):
+        try:
+            return uuid.UUID(str(station_id))
+        except ValueError:
+            return None
+
+
+def build_store(config):
+    if config["BACKEND"] == "shared":
+        return SharedCache(config["CACHE_ALIAS"], config["TIMEOUT"])
+    return LRUCache(config["MAX_SIZE"], config["TIMEOUT"])
+
+
+auth_cache = AuthorizationCache(build_store(settings.CARD_AUTH_CACHE))
@@ -0,0 +1,86 @@
+"""
+Validators for conditional GET requests (ETag / Last-Modified).
+They are much cheaper than the list queries they guard, so unchanged data is
+answered with 304 Not Modified without running the query or the serializer.
+"""
+
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from . import sharding
+from .models import DataVersion
+
+
+def bump_version(name):
+    now = timezone.now()
+    version = DataVersion.objects.filter(name=name)
+    if version.update(version=F("version") + 1, date=now):
+        return
+    try:
+        with transaction.atomic():
+            DataVersion.objects.create(name=name, version=1, date=now)
+    except IntegrityError:
+        version.update(version=F("version") + 1, date=now)
+
+
+def make_etag(*parts):
+    return hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def memoize_on_request(validator):
+    """Runs the validator once per request, condition() asks for the ETag and Last-Modified separately."""
+
+    def wrapper(request, *args, **kwargs):
+        if not hasattr(request, "_validators"):
+            request._validators = validator(request, *args, **kwargs)
+        return request._validators
+
+    return wrapper
+
+
+def get_version(name):
+    """Returns (version, date) of the named data, (0, None) if it never changed."""
+    version = DataVersion.objects.filter(name=name).values_list("version", "date").first()
+    return version or (0, None)
+
+
+def version_validators(name):
+    @memoize_on_request
+    def validators(request, *args, **kwargs):
+        version, date = get_version(name)
+        return make_etag(name, version, request.get_full_path()), date
+
+    return validators
+
+
+@memoize_on_request
+def weather_station_data_validators(request, pk):
+    """
+    The newest reading date and the row count of the station change with every insert or delete,
+    the station version covers a renamed station.
+    No Last-Modified is sent: a backfilled batch adds rows without moving the newest date.
+    """
+    try:
+        stats = sharding.weather_data(pk).filter(weather_station_id=pk).aggregate(
+            last_date=Max("date"), count=Count("id")
+        )
+    except (ValidationError, ValueError):
+        return None, None
+    station_version = get_version("weatherstation")[0]
+    return (
+        make_etag(pk, stats["last_date"], stats["count"], station_version, request.get_full_path()),
+        None,
+    )
+
+
+def conditional(validators):
+    """Adds ETag / Last-Modified to GET responses and answers matching requests with 304."""
+    return condition(
+        etag_func=lambda request, *args, **kwargs: validators(request, *args, **kwargs)[0],
+        last_modified_func=lambda request, *args, **kwargs: validators(request, *args, **kwargs)[1],
+    )
@@ -0,0 +1,106 @@
+"""
+Largest-Triangle-Three-Buckets downsampling of weather data series.
+Keeps the visual shape of a series with far fewer points than min/max bucketing.
+"""
+
+import heapq
+from operator import itemgetter
+
+import numpy as np
+
+from .aggregation import METRICS
+from .streaming import WEATHER_DATA_COLUMNS, WEATHER_DATA_FIELDS, as_output_row
+
+
+def lttb_indices(x, y, threshold):
+    """Returns the sorted indices of the points LTTB keeps from the series (x ascending)."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    # bucket i covers [edges[i], edges[i + 1]), the first and last point are always kept
+    edges = np.floor(np.arange(threshold - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts
+    avg_y = np.add.reduceat(y[1:-1], edges[:-1] - 1) / counts
+    # the point after the last bucket acts as the average of the "next" bucket
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - avg_x[i]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y[i] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_rows(rows, max_points):
+    """
+    Reduces weather data rows (WEATHER_DATA_COLUMNS tuples, oldest first) of one station
+    to at most max_points rows. Every metric gets an equal share of the points, picked by
+    LTTB on that metric, and a row is kept if any of the metrics selects it. Below three
+    points per metric only the first metric is downsampled.
+    """
+    if len(rows) <= max_points:
+        return rows
+    date_column = WEATHER_DATA_COLUMNS.index("date")
+    x = np.fromiter((row[date_column].timestamp() for row in rows), dtype=np.float64, count=len(rows))
+    metrics = METRICS if max_points >= 3 * len(METRICS) else METRICS[:1]
+    threshold = max_points // len(metrics)
+    keep = np.zeros(len(rows), dtype=bool)
+    for metric in metrics:
+        column = WEATHER_DATA_COLUMNS.index(metric)
+        y = np.fromiter((row[column] for row in rows), dtype=np.float64, count=len(rows))
+        keep[lttb_indices(x, y, threshold)] = True
+    return [rows[index] for index in np.flatnonzero(keep)]
+
+
+def downsample_weather_data(queryset, max_points, archived=()):
+    """
+    Returns the serialized readings of the queryset, downsampled per station, newest first.
+    archived are extra WEATHER_DATA_COLUMNS tuples, oldest first, merged into the series.
+    """
+    return as_points(downsample_stations(queryset, max_points, archived))
+
+
+def as_points(rows):
+    """Serializes downsampled rows of any number of stations, newest first."""
+    date_column = WEATHER_DATA_COLUMNS.index("date")
+    rows = sorted(rows, key=itemgetter(date_column), reverse=True)
+    return [dict(zip(WEATHER_DATA_FIELDS, as_output_row(row))) for row in rows]
+
+
+def downsample_stations(queryset, max_points, archived=()):
+    """Downsamples every station of the queryset and returns the kept rows, unordered."""
+    rows = queryset.order_by("weather_station_id", "date").values_list(*WEATHER_DATA_COLUMNS)
+    station_column = WEATHER_DATA_COLUMNS.index("weather_station_id")
+    date_column = WEATHER_DATA_COLUMNS.index("date")
+    archived_series = {}
+    for row in archived:
+        archived_series.setdefault(row[station_column], []).append(row)
+
+    def downsample_series(series):
+        extra = archived_series.pop(series[0][station_column], []) if series else []
+        if extra:
+            series = list(heapq.merge(extra, series, key=itemgetter(date_column)))
+        return downsample_rows(series, max_points)
+
+    result = []
+    series = []
+    for row in rows.iterator(chunk_size=2000):
+        if series and series[-1][station_column] != row[station_column]:
+            result.extend(downsample_series(series))
+            series = []
+        series.append(row)
+    result.extend(downsample_series(series))
+    for series in archived_series.values():
+        result.extend(downsample_rows(series, max_points))
+    return result
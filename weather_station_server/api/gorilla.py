@@ -0,0 +1,183 @@
+"""
+Gorilla-style compression of time series columns (Pelkonen et al., VLDB 2015).
+Timestamps are stored as delta-of-deltas in variable-length buckets, floats as the
+XOR with the previous value, storing only the meaningful bits.
+Bits are collected as "0"/"1" strings and converted with int(bits, 2), which keeps
+encoding and decoding linear in pure Python.
+"""
+
+import math
+
+import numpy as np
+
+# (prefix, number of value bits) of the delta-of-delta buckets, smallest first.
+TIMESTAMP_BUCKETS = (("10", 7), ("110", 9), ("1110", 12), ("11110", 32))
+TIMESTAMP_FALLBACK = ("11111", 64)
+XOR_ENCODED = 0xFF
+
+
+class BitWriter:
+    def __init__(self):
+        self._chunks = []
+        self.length = 0
+
+    def write(self, value, bits):
+        self._chunks.append(format(value & ((1 << bits) - 1), f"0{bits}b"))
+        self.length += bits
+
+    def write_bits(self, bits):
+        self._chunks.append(bits)
+        self.length += len(bits)
+
+    def to_bytes(self):
+        bits = "".join(self._chunks)
+        padding = -len(bits) % 8
+        bits += "0" * padding
+        return int(bits, 2).to_bytes(len(bits) // 8, "big") if bits else b""
+
+
+class BitReader:
+    def __init__(self, data):
+        self._bits = format(int.from_bytes(data, "big"), f"0{len(data) * 8}b") if data else ""
+        self._position = 0
+
+    def read(self, bits):
+        value = int(self._bits[self._position : self._position + bits], 2)
+        self._position += bits
+        return value
+
+    def read_signed(self, bits):
+        value = self.read(bits)
+        return value - (1 << bits) if value >= 1 << (bits - 1) else value
+
+    def read_bit(self):
+        bit = self._bits[self._position] == "1"
+        self._position += 1
+        return bit
+
+
+def encode_timestamps(timestamps):
+    """Encodes integers, e.g. timestamps in microseconds, as delta-of-deltas."""
+    writer = BitWriter()
+    if not timestamps:
+        return writer.to_bytes()
+    writer.write(timestamps[0], 64)
+    previous, previous_delta = timestamps[0], 0
+    for timestamp in timestamps[1:]:
+        delta = timestamp - previous
+        delta_of_delta = delta - previous_delta
+        previous, previous_delta = timestamp, delta
+        if delta_of_delta == 0:
+            writer.write_bits("0")
+            continue
+        for prefix, bits in TIMESTAMP_BUCKETS:
+            if -(1 << (bits - 1)) <= delta_of_delta < 1 << (bits - 1):
+                break
+        else:
+            prefix, bits = TIMESTAMP_FALLBACK
+        writer.write_bits(prefix)
+        writer.write(delta_of_delta, bits)
+    return writer.to_bytes()
+
+
+def decode_timestamps(data, count):
+    if count == 0:
+        return []
+    reader = BitReader(data)
+    timestamp = reader.read_signed(64)
+    timestamps = [timestamp]
+    delta = 0
+    buckets = TIMESTAMP_BUCKETS + (TIMESTAMP_FALLBACK,)
+    for _ in range(count - 1):
+        bucket = 0
+        while bucket < len(buckets) and reader.read_bit():
+            bucket += 1
+        if bucket > 0:
+            delta += reader.read_signed(buckets[bucket - 1][1])
+        timestamp += delta
+        timestamps.append(timestamp)
+    return timestamps
+
+
+def encode_floats(values):
+    writer = BitWriter()
+    if len(values) == 0:
+        return writer.to_bytes()
+    words = np.asarray(values, dtype=">f8").view(">u8").tolist()
+    previous = words[0]
+    writer.write(previous, 64)
+    leading, trailing = None, None
+    for word in words[1:]:
+        xor = word ^ previous
+        previous = word
+        if xor == 0:
+            writer.write_bits("0")
+            continue
+        new_leading = min(64 - xor.bit_length(), 31)
+        new_trailing = (xor & -xor).bit_length() - 1
+        if leading is not None and new_leading >= leading and new_trailing >= trailing:
+            writer.write_bits("10")
+            writer.write(xor >> trailing, 64 - leading - trailing)
+            continue
+        leading, trailing = new_leading, new_trailing
+        meaningful = 64 - leading - trailing
+        writer.write_bits("11")
+        writer.write(leading, 5)
+        writer.write(meaningful - 1, 6)
+        writer.write(xor >> trailing, meaningful)
+    return writer.to_bytes()
+
+
+def decode_floats(data, count):
+    if count == 0:
+        return []
+    reader = BitReader(data)
+    word = reader.read(64)
+    words = [word]
+    leading, trailing = 0, 0
+    for _ in range(count - 1):
+        if reader.read_bit():
+            if reader.read_bit():
+                leading = reader.read(5)
+                trailing = 64 - leading - (reader.read(6) + 1)
+            word ^= reader.read(64 - leading - trailing) << trailing
+        words.append(word)
+    return np.array(words, dtype=">u8").view(">f8").tolist()
+
+
+def decimal_places(values, max_places=6):
+    """
+    Returns the smallest number of decimal places that represents every value exactly,
+    or None. Sensors report a fixed resolution, such values are stored as scaled integers.
+    """
+    for places in range(max_places + 1):
+        scale = 10**places
+        if all(
+            abs(value) < 2**52 / scale
+            and round(value * scale) / scale == value
+            and math.copysign(1.0, value) == math.copysign(1.0, round(value * scale))
+            for value in values
+        ):
+            return places
+    return None
+
+
+def encode_values(values):
+    """
+    Encodes a float column. Values with a fixed decimal resolution are scaled to integers
+    and stored as delta-of-deltas, anything else falls back to the XOR encoding.
+    The first byte is the number of decimal places, or XOR_ENCODED.
+    """
+    places = decimal_places(values)
+    if places is None:
+        return bytes([XOR_ENCODED]) + encode_floats(values)
+    scale = 10**places
+    return bytes([places]) + encode_timestamps([round(value * scale) for value in values])
+
+
+def decode_values(data, count):
+    places = data[0]
+    if places == XOR_ENCODED:
+        return decode_floats(data[1:], count)
+    scale = 10**places
+    return [value / scale for value in decode_timestamps(data[1:], count)]
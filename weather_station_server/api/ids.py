@@ -0,0 +1,36 @@
+"""
+Primary keys of the append-only tables.
+Random uuid4 keys land anywhere in the primary key index, so every insert into a large
+table touches a random page. UUIDv7 keys (RFC 9562) start with the creation time in
+milliseconds, new rows are appended at the end of the index instead. They are still
+UUIDs, so the API and the existing rows are unaffected.
+Enabled with the TIME_ORDERED_IDS setting.
+"""
+
+import os
+import time
+import uuid
+
+from django.conf import settings
+
+
+def uuid7():
+    """
+    Returns a UUIDv7: 48 bits of Unix time in milliseconds, 12 bits of sub-millisecond
+    time (RFC 9562 method 3), so ids of one process stay ordered, and 62 random bits.
+    """
+    nanoseconds = time.time_ns()
+    milliseconds, remainder = divmod(nanoseconds, 1_000_000)
+    fraction = remainder * 4096 // 1_000_000
+    random = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (milliseconds & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76 | fraction << 64
+    value |= 0b10 << 62 | random
+    return uuid.UUID(int=value)
+
+
+def time_ordered_id():
+    """Default of the WeatherData and EmployeeCardLog primary keys."""
+    if settings.TIME_ORDERED_IDS:
+        return uuid7()
+    return uuid.uuid4()
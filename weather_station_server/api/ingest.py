@@ -0,0 +1,74 @@
+"""
+Single write path for new weather readings.
+Every endpoint that stores readings goes through save_weather_data so the data
+derived from them stays in sync with the raw table.
+"""
+
+from django.db import IntegrityError, transaction
+
+from . import response_cache, rollups, sharding
+from .models import WeatherData, WeatherStation, WeatherStationLatestReading
+
+
+def save_weather_data(readings):
+    """
+    Saves new WeatherData instances and updates the rollups and latest readings in one transaction.
+    With shards, the readings commit on their shard first, a failure after that leaves
+    readings without rollups, which rebuild_rollups repairs, never rollups without readings.
+    """
+    with transaction.atomic():
+        for alias, shard_readings in sharding.group_by_shard(readings).items():
+            with transaction.atomic(using=alias, savepoint=False):
+                if len(shard_readings) == 1:
+                    shard_readings[0].save(using=alias)
+                else:
+                    WeatherData.objects.using(alias).bulk_create(shard_readings)
+                    # bulk_create sends no post_save signals
+                    response_cache.invalidate(WeatherData, shard_readings)
+        rollups.apply_readings(readings)
+        update_latest_readings(readings)
+    return readings
+
+
+def update_latest_readings(readings):
+    """Upserts the latest reading of every station unless a newer one is already stored."""
+    newest = {}
+    for reading in readings:
+        current = newest.get(reading.weather_station_id)
+        if current is None or reading.date > current.date:
+            newest[reading.weather_station_id] = reading
+    for weather_station_id, reading in newest.items():
+        values = {
+            "weather_data_id": reading.id,
+            "temperature": reading.temperature,
+            "humidity": reading.humidity,
+            "pressure": reading.pressure,
+            "date": reading.date,
+        }
+        older = WeatherStationLatestReading.objects.filter(
+            weather_station_id=weather_station_id, date__lt=reading.date
+        )
+        if older.update(**values):
+            continue
+        try:
+            with transaction.atomic():
+                WeatherStationLatestReading.objects.create(
+                    weather_station_id=weather_station_id, **values
+                )
+        except IntegrityError:
+            older.update(**values)
+
+
+def rebuild_latest_readings():
+    """Recomputes the latest reading of every station from the raw readings."""
+    with transaction.atomic():
+        WeatherStationLatestReading.objects.all().delete()
+        for weather_station_id in WeatherStation.objects.values_list("id", flat=True):
+            reading = (
+                sharding.weather_data(weather_station_id)
+                .filter(weather_station_id=weather_station_id)
+                .order_by("-date")
+                .first()
+            )
+            if reading is not None:
+                update_latest_readings([reading])
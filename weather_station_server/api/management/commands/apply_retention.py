@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the weather data, rollups and card logs older than the RETENTION setting "
+        "in small batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Rows deleted per transaction (default: RETENTION_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--pause-ms",
+            type=int,
+            default=None,
+            help="Pause between the batches (default: RETENTION_PAUSE_MS)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the rows that would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] is not None and options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if options["pause_ms"] is not None and options["pause_ms"] < 0:
+            raise CommandError("--pause-ms must not be negative")
+        pause = options["pause_ms"] / 1000 if options["pause_ms"] is not None else None
+        result = retention.apply_retention(options["batch_size"], pause, options["dry_run"])
+        verb = "would be deleted" if options["dry_run"] else "deleted"
+        for name, (before, rows) in result.items():
+            if before is None:
+                self.stdout.write(f"{name}: kept forever")
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS(f"{name}: {rows} rows older than {before.isoformat()} {verb}")
+                )
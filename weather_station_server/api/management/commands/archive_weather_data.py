@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api import archive
+from api.models import WeatherStation
+
+
+class Command(BaseCommand):
+    help = "Moves old weather data into the compressed per-station, per-month archive files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=settings.WEATHER_ARCHIVE["AGE_DAYS"],
+            help="Archive readings older than this many days (default: WEATHER_ARCHIVE_AGE_DAYS)",
+        )
+        parser.add_argument("--station", help="Only archive the readings of this weather station ID")
+
+    def handle(self, *args, **options):
+        weather_station = None
+        if options["station"]:
+            try:
+                weather_station = WeatherStation.objects.get(id=options["station"])
+            except (WeatherStation.DoesNotExist, ValueError):
+                raise CommandError(f"Weather station {options['station']} does not exist")
+        if options["older_than_days"] < 0:
+            raise CommandError("--older-than-days must not be negative")
+        before = timezone.now() - timedelta(days=options["older_than_days"])
+        archived, written = archive.archive_weather_data(before, weather_station)
+        message = f"{archived} readings archived, {written} bytes written"
+        if archived:
+            message += f" ({written / archived:.1f} bytes per reading)"
+        self.stdout.write(self.style.SUCCESS(message))
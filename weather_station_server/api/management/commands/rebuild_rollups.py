@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import rollups
+from api.models import WeatherStation
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the minute, hourly and daily weather data rollups from the raw readings. "
+        "Buckets older than the archived or expired readings are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--station", help="Only rebuild the rollups of this weather station ID")
+
+    def handle(self, *args, **options):
+        weather_station = None
+        if options["station"]:
+            try:
+                weather_station = WeatherStation.objects.get(id=options["station"])
+            except (WeatherStation.DoesNotExist, ValueError):
+                raise CommandError(f"Weather station {options['station']} does not exist")
+        since = rollups.complete_since(weather_station)
+        if since is not None:
+            self.stdout.write(f"Keeping the rollups of buckets starting before {since.isoformat()}")
+        rebuilt = rollups.rebuild(weather_station, since=since)
+        for period, count in rebuilt.items():
+            self.stdout.write(self.style.SUCCESS(f"{period}: {count} rollup rows"))
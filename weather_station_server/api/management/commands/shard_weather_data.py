@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from api import sharding
+from api.models import WeatherData, WeatherStation
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies the weather stations to every shard and moves the weather data of every "
+        "station to its shard, from the default database or from a shard it no longer hashes to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Readings moved per transaction"
+        )
+
+    def handle(self, *args, **options):
+        if not sharding.is_sharded():
+            raise CommandError("No weather data shards configured, set DATABASE_SHARD_URLS")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        weather_stations = list(WeatherStation.objects.using(DEFAULT_DB_ALIAS))
+        for weather_station in weather_stations:
+            sharding.copy_weather_station(weather_station)
+        sources = [DEFAULT_DB_ALIAS] + [
+            alias for alias in sharding.shard_aliases() if alias != DEFAULT_DB_ALIAS
+        ]
+        for weather_station in weather_stations:
+            target = sharding.shard_for(weather_station.id)
+            for source in sources:
+                if source != target:
+                    moved = self.move(weather_station.id, source, target, options["batch_size"])
+                    if moved:
+                        self.stdout.write(
+                            self.style.SUCCESS(
+                                f"{weather_station.id}: {moved} readings moved from {source} to {target}"
+                            )
+                        )
+
+    def move(self, weather_station_id, source, target, batch_size):
+        """Copies a batch to the target before deleting it, an interrupted run can be repeated."""
+        readings = WeatherData.objects.using(source).filter(weather_station_id=weather_station_id)
+        moved = 0
+        while True:
+            batch = list(readings.order_by("id")[:batch_size])
+            if not batch:
+                return moved
+            with transaction.atomic(using=target):
+                WeatherData.objects.using(target).bulk_create(batch, ignore_conflicts=True)
+            with transaction.atomic(using=source):
+                # The response cache is unaffected, the readings themselves do not change.
+                moved_ids = [reading.id for reading in batch]
+                WeatherData.objects.using(source).filter(id__in=moved_ids).delete()
+            moved += len(batch)
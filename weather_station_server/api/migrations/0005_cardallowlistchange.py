@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_alter_employeecard_employee'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CardAllowlistChange',
+            fields=[
+                ('version', models.BigAutoField(primary_key=True, serialize=False)),
+                ('card_number', models.CharField(max_length=50)),
+                ('is_allowed', models.BooleanField()),
+                ('date', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'CardAllowlistChange',
+                'verbose_name_plural': 'CardAllowlistChanges',
+            },
+        ),
+    ]
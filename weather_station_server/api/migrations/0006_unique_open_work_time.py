@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+def close_duplicate_open_work_times(apps, schema_editor):
+    """Closes every open WorkTime of an employee except the newest one, at the start of the next one."""
+    WorkTime = apps.get_model("api", "WorkTime")
+    open_work_times = WorkTime.objects.filter(end_date__isnull=True).order_by("employee_id", "-start_date")
+    newer = None
+    for work_time in open_work_times:
+        if newer is not None and newer.employee_id == work_time.employee_id:
+            work_time.end_date = newer.start_date
+            work_time.save(update_fields=["end_date"])
+        newer = work_time
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_cardallowlistchange'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_open_work_times, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='worktime',
+            constraint=models.UniqueConstraint(condition=models.Q(('end_date__isnull', True)), fields=('employee',), name='unique_open_work_time'),
+        ),
+    ]
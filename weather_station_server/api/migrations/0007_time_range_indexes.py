@@ -0,0 +1,41 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_unique_open_work_time'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employeecardlog',
+            index=models.Index(fields=['employee_card', '-date'], name='cardlog_card_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeecardlog',
+            index=models.Index(fields=['-date'], name='cardlog_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weatherdata',
+            index=models.Index(fields=['weather_station', '-date'], name='weatherdata_station_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weatherdata',
+            index=models.Index(fields=['-date'], name='weatherdata_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='worktime',
+            index=models.Index(fields=['employee', '-start_date'], name='worktime_employee_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='worktime',
+            index=models.Index(fields=['work_space', '-start_date'], name='worktime_space_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='worktime',
+            index=models.Index(fields=['-start_date'], name='worktime_start_idx'),
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:48
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+
+def fill_rollups(apps, schema_editor):
+    WeatherData = apps.get_model("api", "WeatherData")
+    aggregates = {"count": Count("id")}
+    for metric in ("temperature", "humidity", "pressure"):
+        aggregates[f"{metric}_sum"] = Sum(metric)
+        aggregates[f"{metric}_min"] = Min(metric)
+        aggregates[f"{metric}_max"] = Max(metric)
+    for model_name, trunc in (("WeatherDataHourly", TruncHour), ("WeatherDataDaily", TruncDay)):
+        model = apps.get_model("api", model_name)
+        rows = (
+            WeatherData.objects.order_by()
+            .annotate(bucket=trunc("date", tzinfo=timezone.get_default_timezone()))
+            .values("weather_station_id", "bucket")
+            .annotate(**aggregates)
+        )
+        model.objects.bulk_create(
+            (model(**row) for row in rows.iterator(chunk_size=1000)), batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_time_range_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherDataDaily',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('bucket', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('temperature_sum', models.FloatField()),
+                ('temperature_min', models.FloatField()),
+                ('temperature_max', models.FloatField()),
+                ('humidity_sum', models.FloatField()),
+                ('humidity_min', models.FloatField()),
+                ('humidity_max', models.FloatField()),
+                ('pressure_sum', models.FloatField()),
+                ('pressure_min', models.FloatField()),
+                ('pressure_max', models.FloatField()),
+                ('weather_station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.weatherstation')),
+            ],
+            options={
+                'verbose_name': 'WeatherDataDaily',
+                'verbose_name_plural': 'WeatherDataDailies',
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='WeatherDataHourly',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('bucket', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('temperature_sum', models.FloatField()),
+                ('temperature_min', models.FloatField()),
+                ('temperature_max', models.FloatField()),
+                ('humidity_sum', models.FloatField()),
+                ('humidity_min', models.FloatField()),
+                ('humidity_max', models.FloatField()),
+                ('pressure_sum', models.FloatField()),
+                ('pressure_min', models.FloatField()),
+                ('pressure_max', models.FloatField()),
+                ('weather_station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.weatherstation')),
+            ],
+            options={
+                'verbose_name': 'WeatherDataHourly',
+                'verbose_name_plural': 'WeatherDataHourlies',
+                'abstract': False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='weatherdatadaily',
+            constraint=models.UniqueConstraint(fields=('weather_station', 'bucket'), name='weatherdatadaily_station_bucket'),
+        ),
+        migrations.AddConstraint(
+            model_name='weatherdatahourly',
+            constraint=models.UniqueConstraint(fields=('weather_station', 'bucket'), name='weatherdatahourly_station_bucket'),
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_latest_readings(apps, schema_editor):
+    WeatherStation = apps.get_model("api", "WeatherStation")
+    WeatherData = apps.get_model("api", "WeatherData")
+    WeatherStationLatestReading = apps.get_model("api", "WeatherStationLatestReading")
+    for weather_station_id in WeatherStation.objects.values_list("id", flat=True):
+        weather_data = (
+            WeatherData.objects.filter(weather_station_id=weather_station_id).order_by("-date").first()
+        )
+        if weather_data is not None:
+            WeatherStationLatestReading.objects.create(
+                weather_station_id=weather_station_id,
+                weather_data_id=weather_data.id,
+                temperature=weather_data.temperature,
+                humidity=weather_data.humidity,
+                pressure=weather_data.pressure,
+                date=weather_data.date,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_weather_data_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherStationLatestReading',
+            fields=[
+                ('weather_station', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='latest_reading', serialize=False, to='api.weatherstation')),
+                ('weather_data_id', models.UUIDField()),
+                ('temperature', models.FloatField()),
+                ('humidity', models.FloatField()),
+                ('pressure', models.FloatField()),
+                ('date', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'WeatherStationLatestReading',
+                'verbose_name_plural': 'WeatherStationLatestReadings',
+            },
+        ),
+        migrations.RunPython(fill_latest_readings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_weather_station_latest_reading'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('date', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'DataVersion',
+                'verbose_name_plural': 'DataVersions',
+            },
+        ),
+    ]
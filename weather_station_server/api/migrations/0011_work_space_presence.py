@@ -0,0 +1,44 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_presence(apps, schema_editor):
+    WorkTime = apps.get_model("api", "WorkTime")
+    WorkSpacePresence = apps.get_model("api", "WorkSpacePresence")
+    WorkSpacePresence.objects.bulk_create(
+        WorkSpacePresence(
+            work_time_id=work_time_id,
+            work_space_id=work_space_id,
+            employee_id=employee_id,
+            start_date=start_date,
+        )
+        for work_time_id, work_space_id, employee_id, start_date in WorkTime.objects.filter(
+            end_date=None
+        ).values_list("id", "work_space_id", "employee_id", "start_date")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkSpacePresence',
+            fields=[
+                ('work_time', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='presence', serialize=False, to='api.worktime')),
+                ('start_date', models.DateTimeField()),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.employee')),
+                ('work_space', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='presence', to='api.workspace')),
+            ],
+            options={
+                'verbose_name': 'WorkSpacePresence',
+                'verbose_name_plural': 'WorkSpacePresences',
+            },
+        ),
+        migrations.RunPython(fill_presence, migrations.RunPython.noop),
+    ]
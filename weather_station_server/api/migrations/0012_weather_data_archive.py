@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:05
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_work_space_presence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherDataArchive',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('month', models.DateField()),
+                ('start_date', models.DateTimeField()),
+                ('end_date', models.DateTimeField()),
+                ('count', models.IntegerField()),
+                ('file_name', models.CharField(max_length=255)),
+                ('size', models.IntegerField()),
+                ('weather_station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.weatherstation')),
+            ],
+            options={
+                'verbose_name': 'WeatherDataArchive',
+                'verbose_name_plural': 'WeatherDataArchives',
+                'indexes': [models.Index(fields=['end_date'], name='weatherdataarchive_end_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='weatherdataarchive',
+            constraint=models.UniqueConstraint(fields=('weather_station', 'month'), name='weatherdataarchive_station_month'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:10
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+
+
+def fill_minute_rollups(apps, schema_editor):
+    WeatherData = apps.get_model("api", "WeatherData")
+    WeatherDataMinute = apps.get_model("api", "WeatherDataMinute")
+    aggregates = {"count": Count("id")}
+    for metric in ("temperature", "humidity", "pressure"):
+        aggregates[f"{metric}_sum"] = Sum(metric)
+        aggregates[f"{metric}_min"] = Min(metric)
+        aggregates[f"{metric}_max"] = Max(metric)
+    rows = (
+        WeatherData.objects.order_by()
+        .annotate(bucket=TruncMinute("date", tzinfo=timezone.get_default_timezone()))
+        .values("weather_station_id", "bucket")
+        .annotate(**aggregates)
+    )
+    WeatherDataMinute.objects.bulk_create(
+        (WeatherDataMinute(**row) for row in rows.iterator(chunk_size=1000)), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_weather_data_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherDataMinute',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('bucket', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('temperature_sum', models.FloatField()),
+                ('temperature_min', models.FloatField()),
+                ('temperature_max', models.FloatField()),
+                ('humidity_sum', models.FloatField()),
+                ('humidity_min', models.FloatField()),
+                ('humidity_max', models.FloatField()),
+                ('pressure_sum', models.FloatField()),
+                ('pressure_min', models.FloatField()),
+                ('pressure_max', models.FloatField()),
+                ('weather_station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.weatherstation')),
+            ],
+            options={
+                'verbose_name': 'WeatherDataMinute',
+                'verbose_name_plural': 'WeatherDataMinutes',
+                'abstract': False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='weatherdataminute',
+            constraint=models.UniqueConstraint(fields=('weather_station', 'bucket'), name='weatherdataminute_station_bucket'),
+        ),
+        migrations.RunPython(fill_minute_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:11
+
+import api.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_weather_data_minute_rollup'),
+    ]
+
+    # The default is applied in Python only. On SQLite AlterField would copy the whole
+    # table to change nothing in the database, so only the migration state is altered.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='employeecardlog',
+                    name='id',
+                    field=models.UUIDField(default=api.ids.time_ordered_id, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='weatherdata',
+                    name='id',
+                    field=models.UUIDField(default=api.ids.time_ordered_id, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
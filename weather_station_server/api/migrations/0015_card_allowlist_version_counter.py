@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:48
+
+from django.db import migrations, models
+from django.db.models import Max
+from django.utils import timezone
+
+
+def start_version_counter(apps, schema_editor):
+    CardAllowlistChange = apps.get_model("api", "CardAllowlistChange")
+    DataVersion = apps.get_model("api", "DataVersion")
+    version = CardAllowlistChange.objects.aggregate(version=Max("version"))["version"]
+    if version is not None:
+        DataVersion.objects.update_or_create(
+            name="cardallowlist", defaults={"version": version, "date": timezone.now()}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_time_ordered_ids'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cardallowlistchange',
+            name='version',
+            field=models.BigIntegerField(primary_key=True, serialize=False),
+        ),
+        migrations.RunPython(start_version_counter, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.0.1 on 2026-10-18 17:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_card_allowlist_version_counter'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='employeecardlog',
+            name='cardlog_card_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='employeecardlog',
+            name='cardlog_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='weatherdata',
+            name='weatherdata_station_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='weatherdata',
+            name='weatherdata_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='worktime',
+            name='worktime_employee_start_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='worktime',
+            name='worktime_space_start_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='worktime',
+            name='worktime_start_idx',
+        ),
+        migrations.AddIndex(
+            model_name='employeecardlog',
+            index=models.Index(fields=['employee_card', '-date', '-id'], name='cardlog_card_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeecardlog',
+            index=models.Index(fields=['-date', '-id'], name='cardlog_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weatherdata',
+            index=models.Index(fields=['weather_station', '-date', '-id'], name='weatherdata_station_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weatherdata',
+            index=models.Index(fields=['-date', '-id'], name='weatherdata_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='worktime',
+            index=models.Index(fields=['employee', '-start_date', '-id'], name='worktime_employee_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='worktime',
+            index=models.Index(fields=['work_space', '-start_date', '-id'], name='worktime_space_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='worktime',
+            index=models.Index(fields=['-start_date', '-id'], name='worktime_start_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 import uuid
 
+from .ids import time_ordered_id
+
 
 class Employee(models.Model):
     class Meta:
@@ -37,8 +39,12 @@ class EmployeeCardLog(models.Model):
     class Meta:
         verbose_name = "EmployeeCardLog"
         verbose_name_plural = "EmployeeCardLogs"
+        indexes = [
+            models.Index(fields=["employee_card", "-date", "-id"], name="cardlog_card_date_idx"),
+            models.Index(fields=["-date", "-id"], name="cardlog_date_idx"),
+        ]
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=time_ordered_id, editable=False)
     employee_card = models.ForeignKey(EmployeeCard, on_delete=models.CASCADE)
     weather_station = models.ForeignKey(
         "WeatherStation", on_delete=models.SET_NULL, null=True
@@ -73,6 +79,20 @@ class WorkSpace(models.Model):
         return self.name
         
 class WorkTime(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee"],
+                condition=models.Q(end_date__isnull=True),
+                name="unique_open_work_time",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["employee", "-start_date", "-id"], name="worktime_employee_start_idx"),
+            models.Index(fields=["work_space", "-start_date", "-id"], name="worktime_space_start_idx"),
+            models.Index(fields=["-start_date", "-id"], name="worktime_start_idx"),
+        ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
     work_space = models.ForeignKey(WorkSpace, on_delete=models.CASCADE)
@@ -113,8 +133,12 @@ class WeatherData(models.Model):
     class Meta:
         verbose_name = "WeatherData"
         verbose_name_plural = "WeatherDatas"
+        indexes = [
+            models.Index(fields=["weather_station", "-date", "-id"], name="weatherdata_station_date_idx"),
+            models.Index(fields=["-date", "-id"], name="weatherdata_date_idx"),
+        ]
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=time_ordered_id, editable=False)
     temperature = models.FloatField()
     humidity = models.FloatField()
     pressure = models.FloatField()
@@ -131,3 +155,162 @@ class WeatherData(models.Model):
             + " "
             + str(self.date)
         )
+
+
+class CardAllowlistChange(models.Model):
+    """
+    Change log of the card allowlist used by offline card readers.
+    Every row bumps the allowlist version by one, see allowlist.record_change.
+    """
+
+    class Meta:
+        verbose_name = "CardAllowlistChange"
+        verbose_name_plural = "CardAllowlistChanges"
+
+    version = models.BigIntegerField(primary_key=True)
+    card_number = models.CharField(max_length=50)
+    is_allowed = models.BooleanField()
+    date = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return str(self.version) + " " + self.card_number + " " + str(self.is_allowed)
+
+
+class WeatherDataRollup(models.Model):
+    """Count, sum, min and max of every metric of a weather station over one time bucket."""
+
+    class Meta:
+        abstract = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=["weather_station", "bucket"],
+                name="%(class)s_station_bucket",
+            ),
+        ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    weather_station = models.ForeignKey(
+        WeatherStation, on_delete=models.CASCADE, related_name="+"
+    )
+    bucket = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+    temperature_sum = models.FloatField()
+    temperature_min = models.FloatField()
+    temperature_max = models.FloatField()
+    humidity_sum = models.FloatField()
+    humidity_min = models.FloatField()
+    humidity_max = models.FloatField()
+    pressure_sum = models.FloatField()
+    pressure_min = models.FloatField()
+    pressure_max = models.FloatField()
+
+    def __str__(self):
+        return str(self.weather_station_id) + " " + str(self.bucket) + " " + str(self.count)
+
+
+class WeatherDataMinute(WeatherDataRollup):
+    class Meta(WeatherDataRollup.Meta):
+        verbose_name = "WeatherDataMinute"
+        verbose_name_plural = "WeatherDataMinutes"
+
+
+class WeatherDataHourly(WeatherDataRollup):
+    class Meta(WeatherDataRollup.Meta):
+        verbose_name = "WeatherDataHourly"
+        verbose_name_plural = "WeatherDataHourlies"
+
+
+class WeatherDataDaily(WeatherDataRollup):
+    class Meta(WeatherDataRollup.Meta):
+        verbose_name = "WeatherDataDaily"
+        verbose_name_plural = "WeatherDataDailies"
+
+
+class WeatherStationLatestReading(models.Model):
+    """Most recent reading of a weather station, upserted on ingest."""
+
+    class Meta:
+        verbose_name = "WeatherStationLatestReading"
+        verbose_name_plural = "WeatherStationLatestReadings"
+
+    weather_station = models.OneToOneField(
+        WeatherStation,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="latest_reading",
+    )
+    weather_data_id = models.UUIDField()
+    temperature = models.FloatField()
+    humidity = models.FloatField()
+    pressure = models.FloatField()
+    date = models.DateTimeField()
+
+    def __str__(self):
+        return str(self.weather_station_id) + " " + str(self.date)
+
+
+class DataVersion(models.Model):
+    """Version counter of a model, bumped on every change. Used as a cheap HTTP validator."""
+
+    class Meta:
+        verbose_name = "DataVersion"
+        verbose_name_plural = "DataVersions"
+
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    date = models.DateTimeField()
+
+    def __str__(self):
+        return self.name + " " + str(self.version)
+
+
+class WorkSpacePresence(models.Model):
+    """Open WorkTime of an employee, kept in sync by signals so occupancy never scans WorkTime."""
+
+    class Meta:
+        verbose_name = "WorkSpacePresence"
+        verbose_name_plural = "WorkSpacePresences"
+
+    work_time = models.OneToOneField(
+        WorkTime,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="presence",
+    )
+    work_space = models.ForeignKey(WorkSpace, on_delete=models.CASCADE, related_name="presence")
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="+")
+    start_date = models.DateTimeField()
+
+    def __str__(self):
+        return str(self.work_space_id) + " " + str(self.employee_id)
+
+
+class WeatherDataArchive(models.Model):
+    """
+    One month of archived readings of a weather station, stored in a compressed
+    columnar file (see archive.py) instead of WeatherData rows.
+    """
+
+    class Meta:
+        verbose_name = "WeatherDataArchive"
+        verbose_name_plural = "WeatherDataArchives"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["weather_station", "month"], name="weatherdataarchive_station_month"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["end_date"], name="weatherdataarchive_end_idx"),
+        ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    weather_station = models.ForeignKey(WeatherStation, on_delete=models.CASCADE, related_name="+")
+    month = models.DateField()
+    start_date = models.DateTimeField()
+    end_date = models.DateTimeField()
+    count = models.IntegerField()
+    file_name = models.CharField(max_length=255)
+    size = models.IntegerField()
+
+    def __str__(self):
+        return str(self.weather_station_id) + " " + self.month.strftime("%Y-%m")
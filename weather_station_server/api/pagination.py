@@ -0,0 +1,126 @@
+import heapq
+import uuid
+from itertools import islice
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+from . import sharding
+
+
+class DateCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (date, id), newest first.
+    Unlike the stock CursorPagination, which skips rows with OFFSET, every page
+    is fetched with a plain keyset filter, so page N costs the same as page 1.
+    Works on model and values() querysets. A view with get_shards() has the page
+    fetched from every shard it returns and merged, a view with get_archived_rows()
+    has its archived rows merged into the pages (values() querysets only).
+    """
+
+    ordering = "-date"
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    @property
+    def ordering_field(self):
+        return self.ordering.lstrip("-")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.cursor = self.decode_cursor(request)
+        field = self.ordering_field
+        queryset = queryset.order_by(f"-{field}", "-id")
+        reverse = False
+        if self.cursor is not None:
+            reverse = self.cursor.reverse
+            position_date, position_id = self.decode_position(self.cursor.position)
+            if reverse:
+                queryset = queryset.filter(
+                    Q(**{f"{field}__gt": position_date})
+                    | Q(**{field: position_date, "id__gt": position_id})
+                ).order_by(field, "id")
+            else:
+                queryset = queryset.filter(
+                    Q(**{f"{field}__lt": position_date})
+                    | Q(**{field: position_date, "id__lt": position_id})
+                )
+        shards = view.get_shards() if hasattr(view, "get_shards") else []
+        if len(shards) > 1:
+            results = sharding.first_rows(
+                queryset, self.position_key, self.page_size + 1, reverse=not reverse, aliases=shards
+            )
+        else:
+            results = list(queryset[: self.page_size + 1])
+        if hasattr(view, "get_archived_rows"):
+            position = (position_date, position_id) if self.cursor is not None else None
+            results = self.merge_archived(results, view.get_archived_rows, reverse, position)
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        self.display_page_controls = self.has_next or self.has_previous
+        return self.page
+
+    def merge_archived(self, results, get_archived_rows, reverse, position):
+        """
+        Merges the page with the rows get_archived_rows(descending, after, bound) yields in the
+        same order. Archived rows beyond bound, the last candidate row, cannot reach the page.
+        """
+        field = self.ordering_field
+        bound = results[self.page_size][field] if len(results) > self.page_size else None
+        archived = get_archived_rows(descending=not reverse, after=position, bound=bound)
+        merged = heapq.merge(results, archived, key=self.position_key, reverse=not reverse)
+        return list(islice(merged, self.page_size + 1))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=self.encode_position(self.page[-1]))
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=self.encode_position(self.page[0]))
+        )
+
+    def position_key(self, instance):
+        if isinstance(instance, dict):
+            return instance[self.ordering_field], instance["id"]
+        return getattr(instance, self.ordering_field), instance.pk
+
+    def encode_position(self, instance):
+        if isinstance(instance, dict):
+            return f"{instance[self.ordering_field].isoformat()}|{instance['id']}"
+        return f"{getattr(instance, self.ordering_field).isoformat()}|{instance.pk}"
+
+    def decode_position(self, position):
+        try:
+            position_date, position_id = position.split("|")
+            position_date = parse_datetime(position_date)
+            position_id = uuid.UUID(position_id)
+        except (AttributeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position_date, position_id
+
+
+class StartDateCursorPagination(DateCursorPagination):
+    """Keyset pagination on (start_date, id), newest first."""
+
+    ordering = "-start_date"
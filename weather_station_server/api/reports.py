@@ -0,0 +1,76 @@
+"""
+Work-hours report computed in the database.
+Every shift is clamped to the report range, open shifts end at the report end
+(or now, if that is earlier), and the durations are summed with one GROUP BY query.
+"""
+
+from django.db.models import Count, DateTimeField, DurationField, ExpressionWrapper, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least, TruncDate
+from django.utils import timezone
+
+from .models import WorkTime
+
+GROUPS = {
+    "employee": ("employee_id", "employee__name", "employee__surname"),
+    "work_space": ("work_space_id", "work_space__name"),
+}
+PERIODS = ("total", "day")
+
+
+def work_hours_report(start, end, group_by, period="total", employee=None, work_space=None):
+    """
+    Returns the worked hours between start and end (exclusive) grouped by the GROUPS in
+    group_by and, for the "day" period, by the TIME_ZONE day the (clamped) shift started on.
+    """
+    shift_end = min(end, timezone.now())
+    work_time = WorkTime.objects.filter(start_date__lt=shift_end).exclude(end_date__lte=start)
+    if employee is not None:
+        work_time = work_time.filter(employee=employee)
+    if work_space is not None:
+        work_time = work_time.filter(work_space=work_space)
+    columns = [column for group in group_by for column in GROUPS[group]]
+    clamped_start = Greatest("start_date", Value(start, output_field=DateTimeField()))
+    clamped_end = Least(
+        Coalesce("end_date", Value(shift_end, output_field=DateTimeField())),
+        Value(shift_end, output_field=DateTimeField()),
+    )
+    if period == "day":
+        work_time = work_time.annotate(
+            day=TruncDate(clamped_start, tzinfo=timezone.get_default_timezone())
+        )
+        columns.append("day")
+    rows = (
+        work_time.order_by()
+        .values(*columns)
+        .annotate(
+            duration=Sum(
+                ExpressionWrapper(clamped_end - clamped_start, output_field=DurationField())
+            ),
+            shifts=Count("id"),
+            open_shifts=Count("id", filter=Q(end_date=None)),
+        )
+        .order_by(*columns)
+    )
+    return [as_report_row(row, group_by) for row in rows]
+
+
+def as_report_row(row, group_by):
+    report_row = {}
+    if "employee" in group_by:
+        report_row["employee"] = {
+            "id": str(row["employee_id"]),
+            "name": row["employee__name"],
+            "surname": row["employee__surname"],
+        }
+    if "work_space" in group_by:
+        report_row["work_space"] = {
+            "id": str(row["work_space_id"]),
+            "name": row["work_space__name"],
+        }
+    if "day" in row:
+        report_row["day"] = row["day"].isoformat()
+    seconds = row["duration"].total_seconds() if row["duration"] is not None else 0
+    report_row["hours"] = round(seconds / 3600, 2)
+    report_row["shifts"] = row["shifts"]
+    report_row["open_shifts"] = row["open_shifts"]
+    return report_row
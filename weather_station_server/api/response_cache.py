@@ -0,0 +1,211 @@
+"""
+Caches rendered GET responses in a Django cache.
+A cached response depends on a few scopes, e.g. the readings of one station.
+Every scope has a generation counter that is part of the cache key and is bumped
+when its data changes (see signals.py and ingest.py), so a stale entry is never
+read again and just expires.
+A range that ends before today depends on separate history scopes, which only
+change when older rows are backfilled or deleted, and is kept for HISTORY_TIMEOUT.
+"""
+
+import functools
+import hashlib
+import time
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .utils import parse_date_param
+
+KEY_PREFIX = "response_cache"
+
+# Per model: the field its scopes are partitioned by and the date field history ranges filter on.
+PARTITIONS = {
+    "weatherdata": ("weather_station_id", "date"),
+    "employeecardlog": ("employee_card_id", "date"),
+    "worktime": ("employee_id", None),
+}
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE["CACHE_ALIAS"]]
+
+
+def is_enabled():
+    return settings.RESPONSE_CACHE["ENABLED"]
+
+
+def history_cutoff():
+    """Start of the current day in TIME_ZONE, ranges ending before it are history."""
+    now = timezone.localtime(timezone=timezone.get_default_timezone())
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def is_history(request, param):
+    value = request.query_params.get(param, None)
+    if value is None:
+        return False
+    try:
+        return parse_date_param(value) < history_cutoff()
+    except ValueError:
+        return False
+
+
+def data_scope(name, owner=None, history=False):
+    """Scope of the rows of a model, optionally only those of one station/card/employee."""
+    scope = name
+    if owner is not None:
+        try:
+            scope += f":{uuid.UUID(str(owner))}"
+        except ValueError:
+            pass
+    if history:
+        scope += ":history"
+    return scope
+
+
+def generation_key(scope):
+    return f"{KEY_PREFIX}:generation:{scope}"
+
+
+def get_generations(scopes):
+    cache = get_cache()
+    keys = [generation_key(scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # Start from the clock, so a counter that was evicted never returns to an old value.
+            cache.add(key, time.time_ns(), None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump(scopes):
+    cache = get_cache()
+    for scope in scopes:
+        key = generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate(model, instances):
+    """Bumps the scopes of saved or deleted instances once the current transaction commits."""
+    if not is_enabled():
+        return
+    name = model._meta.model_name
+    owner_field, date_field = PARTITIONS.get(name, (None, None))
+
+    def bump_scopes():
+        cutoff = history_cutoff()
+        scopes = {name}
+        for instance in instances:
+            owner = getattr(instance, owner_field) if owner_field else None
+            if owner is not None:
+                scopes.add(data_scope(name, owner))
+            if date_field is not None and getattr(instance, date_field) < cutoff:
+                scopes.add(data_scope(name, history=True))
+                if owner is not None:
+                    scopes.add(data_scope(name, owner, history=True))
+        bump(scopes)
+
+    transaction.on_commit(bump_scopes)
+
+
+def invalidate_owner(model, owner):
+    """Bumps every scope of the rows of one station/card/employee, e.g. when they were cascade deleted."""
+    if not is_enabled():
+        return
+    name = model._meta.model_name
+    scopes = [
+        name,
+        data_scope(name, owner),
+        data_scope(name, history=True),
+        data_scope(name, owner, history=True),
+    ]
+    transaction.on_commit(lambda: bump(scopes))
+
+
+def make_key(request, scopes):
+    query = sorted(
+        (param, value)
+        for param in request.query_params
+        for value in request.query_params.getlist(param)
+    )
+    parts = [request.build_absolute_uri(request.path), urlencode(query)]
+    parts += [f"{scope}={generation}" for scope, generation in zip(scopes, get_generations(scopes))]
+    return f"{KEY_PREFIX}:response:{hashlib.md5('|'.join(parts).encode()).hexdigest()}"
+
+
+def cache_response(scopes, history_param=None):
+    """
+    Caches the 200 JSON responses of a view method.
+    scopes(request, history, **kwargs) returns the scopes the response depends on,
+    history is True when the history_param query parameter is a date before today.
+    """
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(request, *args, **kwargs):
+            if not is_enabled() or request.accepted_renderer.format != "json":
+                return view_method(request, *args, **kwargs)
+            history = history_param is not None and is_history(request, history_param)
+            key = make_key(request, scopes(request, history, **kwargs))
+            cache = get_cache()
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = view_method(request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                timeout = settings.RESPONSE_CACHE["HISTORY_TIMEOUT" if history else "TIMEOUT"]
+                response.add_post_render_callback(
+                    lambda rendered: cache.set(
+                        key, (rendered.content, rendered["Content-Type"]), timeout
+                    )
+                )
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def weather_data_scopes(request, history, pk=None):
+    if pk is None:
+        pk = request.query_params.get("weather_station", None)
+    return [data_scope("weatherdata", pk, history)]
+
+
+def weather_station_data_scopes(request, history, pk):
+    return [data_scope("weatherdata", pk, history), "weatherstation"]
+
+
+def latest_reading_scopes(request, history):
+    return ["weatherdata", "weatherstation"]
+
+
+def employee_card_log_scopes(request, history, pk=None):
+    if pk is None:
+        pk = request.query_params.get("employee_card", None)
+    return [data_scope("employeecardlog", pk, history)]
+
+
+def employee_card_data_scopes(request, history, pk):
+    return [data_scope("employeecardlog", pk, history), "employeecard", "employee"]
+
+
+def work_time_scopes(request, history):
+    employee = request.query_params.get("employee", None)
+    return [data_scope("worktime", employee), "employee", "workspace", "weatherstation"]
+
+
+def model_scopes(*names):
+    return lambda request, history, **kwargs: list(names)
@@ -0,0 +1,177 @@
+"""
+Tiered retention of the append-only tables, configured by the RETENTION setting.
+Raw readings, their minute, hourly and daily rollups and the card logs each have their
+own age limit, a tier without one is kept forever. The apply_retention command removes
+expired rows in small batches, each in its own transaction, so the SQLite write lock
+is only held briefly and device writes get in between the batches.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from . import response_cache, sharding
+from .archive import remove_orphaned_files
+from .models import (
+    EmployeeCardLog,
+    WeatherData,
+    WeatherDataArchive,
+    WeatherDataDaily,
+    WeatherDataHourly,
+    WeatherDataMinute,
+)
+
+# name: (model, date field, RETENTION key, model whose cached responses show the rows, owner field)
+TIERS = {
+    "weather_data": (WeatherData, "date", "WEATHER_DATA_DAYS", WeatherData, "weather_station_id"),
+    "weather_data_minute": (
+        WeatherDataMinute,
+        "bucket",
+        "WEATHER_DATA_MINUTE_DAYS",
+        WeatherData,
+        "weather_station_id",
+    ),
+    "weather_data_hourly": (
+        WeatherDataHourly,
+        "bucket",
+        "WEATHER_DATA_HOURLY_DAYS",
+        WeatherData,
+        "weather_station_id",
+    ),
+    "weather_data_daily": (
+        WeatherDataDaily,
+        "bucket",
+        "WEATHER_DATA_DAILY_DAYS",
+        WeatherData,
+        "weather_station_id",
+    ),
+    "employee_card_log": (
+        EmployeeCardLog,
+        "date",
+        "EMPLOYEE_CARD_LOG_DAYS",
+        EmployeeCardLog,
+        "employee_card_id",
+    ),
+}
+
+
+def get_cutoff(key, now=None):
+    """Returns the date before which the rows of a tier expire, None if they are kept forever."""
+    days = settings.RETENTION[key]
+    if days is None:
+        return None
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def raw_data_cutoff():
+    return get_cutoff("WEATHER_DATA_DAYS")
+
+
+def get_databases(model):
+    """The readings are spread over the weather data shards, see sharding.py."""
+    if model is WeatherData:
+        return sharding.shard_aliases()
+    return [DEFAULT_DB_ALIAS]
+
+
+def count_expired(name, before):
+    model, date_field = TIERS[name][:2]
+    return sum(
+        model.objects.using(alias).filter(**{f"{date_field}__lt": before}).count()
+        for alias in get_databases(model)
+    )
+
+
+def delete_expired(name, before, batch_size, pause=0):
+    """
+    Deletes the rows of a tier older than before, oldest first, batch_size rows per
+    transaction, sleeping pause seconds between the batches. Returns the number deleted.
+    """
+    model = TIERS[name][0]
+    return sum(
+        delete_expired_rows(name, alias, before, batch_size, pause) for alias in get_databases(model)
+    )
+
+
+def delete_expired_rows(name, alias, before, batch_size, pause):
+    model, date_field, _, cache_model, owner_field = TIERS[name]
+    expired = model.objects.using(alias).filter(**{f"{date_field}__lt": before}).order_by(date_field)
+    deleted = 0
+    while True:
+        with transaction.atomic(using=alias):
+            rows = list(expired.values_list("pk", owner_field, date_field)[:batch_size])
+            if not rows:
+                break
+            # The expiring tables have no delete signals, so this is a single DELETE, the
+            # response cache is invalidated once per station or card instead.
+            model.objects.using(alias).filter(pk__in=[row[0] for row in rows]).delete()
+        owners = {}
+        for _, owner, date in rows:
+            owners.setdefault(owner, date)
+        response_cache.invalidate(
+            cache_model,
+            [cache_model(**{owner_field: owner, "date": date}) for owner, date in owners.items()],
+        )
+        deleted += len(rows)
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+def expired_archives(before):
+    """Archive files whose readings are all older than before, see archive.py."""
+    return WeatherDataArchive.objects.filter(end_date__lt=before)
+
+
+def delete_expired_archives(before):
+    """
+    Drops the archive files that only hold expired readings. Archived readings are removed
+    a whole file, i.e. a station and month, at a time. Returns the number of readings dropped.
+    """
+    archives = list(expired_archives(before).values_list("id", "weather_station_id", "start_date", "count"))
+    with transaction.atomic():
+        WeatherDataArchive.objects.filter(id__in=[archive[0] for archive in archives]).delete()
+        response_cache.invalidate(
+            WeatherData,
+            [WeatherData(weather_station_id=archive[1], date=archive[2]) for archive in archives],
+        )
+    remove_orphaned_files()
+    return sum(archive[3] for archive in archives)
+
+
+def apply_retention(batch_size=None, pause=None, dry_run=False):
+    """
+    Enforces the RETENTION setting on every tier. Returns {name: (cutoff, rows)} with the
+    rows deleted, or the rows that would be deleted if dry_run is set. Tiers kept forever
+    have no cutoff.
+    """
+    if batch_size is None:
+        batch_size = settings.RETENTION["BATCH_SIZE"]
+    if pause is None:
+        pause = settings.RETENTION["PAUSE_MS"] / 1000
+    now = timezone.now()
+    result = {}
+    for name, (_, _, key, _, _) in TIERS.items():
+        before = get_cutoff(key, now)
+        if before is None:
+            result[name] = (None, 0)
+        elif dry_run:
+            result[name] = (before, count_expired(name, before))
+        else:
+            result[name] = (before, delete_expired(name, before, batch_size, pause))
+    before = get_cutoff("WEATHER_DATA_DAYS", now)
+    if before is None:
+        result["weather_data_archive"] = (None, 0)
+    elif dry_run:
+        result["weather_data_archive"] = (
+            before,
+            sum(expired_archives(before).values_list("count", flat=True)),
+        )
+    else:
+        result["weather_data_archive"] = (before, delete_expired_archives(before))
+    return result
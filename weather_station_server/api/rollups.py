@@ -0,0 +1,130 @@
+"""
+Minute, hourly and daily rollups of weather data.
+They are updated incrementally as readings are saved (see ingest.py) and can be
+rebuilt from the raw readings with the rebuild_rollups management command.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min, Sum, Value
+from django.db.models.functions import Greatest, Least, TruncDay, TruncHour, TruncMinute
+from django.utils import timezone
+
+from . import sharding
+from .aggregation import METRICS, bucket_start
+from .models import WeatherData, WeatherDataArchive, WeatherDataDaily, WeatherDataHourly, WeatherDataMinute
+from .retention import raw_data_cutoff
+
+ROLLUPS = {
+    "minute": (WeatherDataMinute, TruncMinute),
+    "hour": (WeatherDataHourly, TruncHour),
+    "day": (WeatherDataDaily, TruncDay),
+}
+
+
+def summarize(readings, period):
+    """Groups readings by (station, bucket) and returns the count, sum, min and max of every metric."""
+    summaries = {}
+    for reading in readings:
+        key = (reading.weather_station_id, bucket_start(reading.date, period))
+        summary = summaries.get(key)
+        if summary is None:
+            summary = summaries[key] = {"count": 0}
+            for metric in METRICS:
+                value = getattr(reading, metric)
+                summary[f"{metric}_sum"] = 0.0
+                summary[f"{metric}_min"] = value
+                summary[f"{metric}_max"] = value
+        summary["count"] += 1
+        for metric in METRICS:
+            value = getattr(reading, metric)
+            summary[f"{metric}_sum"] += value
+            summary[f"{metric}_min"] = min(summary[f"{metric}_min"], value)
+            summary[f"{metric}_max"] = max(summary[f"{metric}_max"], value)
+    return summaries
+
+
+def merge_summary(model, weather_station_id, bucket, summary):
+    changes = {"count": F("count") + summary["count"]}
+    for metric in METRICS:
+        changes[f"{metric}_sum"] = F(f"{metric}_sum") + summary[f"{metric}_sum"]
+        changes[f"{metric}_min"] = Least(f"{metric}_min", Value(summary[f"{metric}_min"]))
+        changes[f"{metric}_max"] = Greatest(f"{metric}_max", Value(summary[f"{metric}_max"]))
+    rollup = model.objects.filter(weather_station_id=weather_station_id, bucket=bucket)
+    if rollup.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(weather_station_id=weather_station_id, bucket=bucket, **summary)
+    except IntegrityError:
+        rollup.update(**changes)
+
+
+def apply_readings(readings):
+    """Adds newly saved readings to every rollup. Must run in the transaction that saved them."""
+    for period, (model, _) in ROLLUPS.items():
+        for (weather_station_id, bucket), summary in summarize(readings, period).items():
+            merge_summary(model, weather_station_id, bucket, summary)
+
+
+def complete_since(weather_station=None):
+    """
+    Returns the date from which the raw readings are complete, None if none were ever removed.
+    Older readings were archived (see archive.py) or removed by the retention policy.
+    """
+    archives = WeatherDataArchive.objects.all()
+    if weather_station is not None:
+        archives = archives.filter(weather_station=weather_station)
+    since = archives.aggregate(end_date=Max("end_date"))["end_date"]
+    cutoff = raw_data_cutoff()
+    if cutoff is not None and (since is None or cutoff > since):
+        since = cutoff
+    return since
+
+
+def rebuild(weather_station=None, batch_size=1000, since=None):
+    """
+    Recomputes the rollups from the raw readings, for one station or for all of them.
+    Only buckets starting after since are recomputed, older ones are kept as they are.
+    """
+    weather_data = WeatherData.objects.all()
+    aliases = sharding.shard_aliases()
+    if weather_station is not None:
+        weather_data = weather_data.filter(weather_station=weather_station)
+        aliases = [sharding.shard_for(weather_station.id)]
+    if since is not None:
+        weather_data = weather_data.filter(date__gt=since)
+    aggregates = {"count": Count("id")}
+    for metric in METRICS:
+        aggregates[f"{metric}_sum"] = Sum(metric)
+        aggregates[f"{metric}_min"] = Min(metric)
+        aggregates[f"{metric}_max"] = Max(metric)
+    rebuilt = {}
+    with transaction.atomic():
+        for period, (model, trunc) in ROLLUPS.items():
+            rollups = model.objects.all()
+            if weather_station is not None:
+                rollups = rollups.filter(weather_station=weather_station)
+            rows = (
+                weather_data.order_by()
+                .annotate(bucket=trunc("date", tzinfo=timezone.get_default_timezone()))
+                .values("weather_station_id", "bucket")
+                .annotate(**aggregates)
+            )
+            if since is not None:
+                # A bucket that starts before since may be missing removed readings.
+                rollups = rollups.filter(bucket__gt=since)
+                rows = rows.filter(bucket__gt=since)
+            rollups.delete()
+            batch = []
+            rebuilt[period] = 0
+            # A station's readings are all in one shard, so the shards never share a bucket.
+            for alias in aliases:
+                for row in rows.using(alias).iterator(chunk_size=batch_size):
+                    batch.append(model(**row))
+                    if len(batch) >= batch_size:
+                        model.objects.bulk_create(batch)
+                        rebuilt[period] += len(batch)
+                        batch = []
+            model.objects.bulk_create(batch)
+            rebuilt[period] += len(batch)
+    return rebuilt
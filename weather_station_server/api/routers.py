@@ -0,0 +1,127 @@
+"""
+Read/write splitting between the primary database and a read replica.
+Views with ReplicaReadMixin read from the "replica" alias, everything else, and every
+write, uses "default". A client that wrote something reads from the primary for
+REPLICA["STICKY_SECONDS"] afterwards, so it sees its own writes despite replication lag.
+The client is marked with a signed cookie, which carries its own expiry, so clients
+behind one NAT or proxy do not share the mark and no shared state is needed between
+worker processes. Cached responses (see response_cache.py) may have been rendered from
+the replica and lag behind by as much as the replica does.
+"""
+
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+REPLICA = "replica"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+STICKY_SALT = "api.routers.sticky"
+
+use_replica = ContextVar("use_replica", default=False)
+
+
+def replica_enabled():
+    return settings.REPLICA["ENABLED"]
+
+
+def is_sticky(request):
+    """True while the client has a valid mark from a write in the last STICKY_SECONDS."""
+    return (
+        request.get_signed_cookie(
+            settings.REPLICA["COOKIE_NAME"],
+            default=None,
+            salt=STICKY_SALT,
+            max_age=settings.REPLICA["STICKY_SECONDS"],
+        )
+        is not None
+    )
+
+
+def mark_sticky(request, response):
+    if request.method in SAFE_METHODS or not replica_enabled():
+        return
+    response.set_signed_cookie(
+        settings.REPLICA["COOKIE_NAME"],
+        "1",
+        salt=STICKY_SALT,
+        max_age=settings.REPLICA["STICKY_SECONDS"],
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+class ReplicaRouter:
+    """Sends reads to the replica while use_replica is set, see ReplicaReadMixin."""
+
+    def db_for_read(self, model, **hints):
+        if use_replica.get():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets the schema from the primary through replication.
+        return db != REPLICA
+
+
+def read_from_replica(content):
+    """
+    Iterates streamed content with use_replica set: the querysets of a streamed export
+    only run once the server iterates the response, after the view returned. It is set
+    around every chunk, consecutive chunks may be produced in different contexts.
+    """
+    iterator = iter(content)
+    while True:
+        token = use_replica.set(True)
+        try:
+            chunk = next(iterator, None)
+        finally:
+            use_replica.reset(token)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class ReplicaReadMixin:
+    """Read-only requests of the view read from the replica, unless the client is sticky."""
+
+    def dispatch(self, request, *args, **kwargs):
+        replica = replica_enabled() and request.method in SAFE_METHODS and not is_sticky(request)
+        token = use_replica.set(replica)
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        finally:
+            use_replica.reset(token)
+        if replica and response.streaming and not response.is_async:
+            response.streaming_content = read_from_replica(response.streaming_content)
+        return response
+
+
+class ReplicaStickinessMiddleware:
+    """Marks a client that sent a write request as sticky to the primary for a while."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        mark_sticky(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        mark_sticky(request, response)
+        return response
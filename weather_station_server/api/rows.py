@@ -0,0 +1,73 @@
+"""
+Lean read path for large lists.
+Rows are read with values() and turned into the same dicts the ModelSerializers
+produce, without instantiating a model and a serializer per row.
+"""
+
+from rest_framework import ISO_8601
+from rest_framework.fields import DateTimeField
+from rest_framework.settings import api_settings
+
+from .streaming import WEATHER_DATA_COLUMNS, format_datetime
+
+EMPLOYEE_CARD_LOG_COLUMNS = ("id", "employee_card_id", "date", "weather_station_id")
+
+
+def datetime_formatter():
+    """
+    Returns a function that formats datetimes like DateTimeField.to_representation, with the
+    time zone looked up once instead of for every value.
+    """
+    time_zone = DateTimeField().default_timezone()
+    if time_zone is None or api_settings.DATETIME_FORMAT != ISO_8601:
+        return format_datetime
+
+    def format_value(value):
+        if value is None:
+            return None
+        value = value.astimezone(time_zone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return format_value
+
+
+def weather_data_values(queryset):
+    return queryset.values(*WEATHER_DATA_COLUMNS)
+
+
+def weather_data_rows(values):
+    """Serializes weather data values() like WeatherDataSerializer."""
+    format_datetime = datetime_formatter()
+    return [
+        {
+            "id": str(row["id"]),
+            "weather_station": str(row["weather_station_id"]),
+            "temperature": row["temperature"],
+            "humidity": row["humidity"],
+            "pressure": row["pressure"],
+            "date": format_datetime(row["date"]),
+        }
+        for row in values
+    ]
+
+
+def employee_card_log_values(queryset):
+    return queryset.values(*EMPLOYEE_CARD_LOG_COLUMNS)
+
+
+def employee_card_log_rows(values):
+    """Serializes employee card log values() like EmployeeCardLogSerializer."""
+    format_datetime = datetime_formatter()
+    return [
+        {
+            "id": str(row["id"]),
+            "employee_card": str(row["employee_card_id"]),
+            "date": format_datetime(row["date"]),
+            "weather_station": (
+                str(row["weather_station_id"]) if row["weather_station_id"] is not None else None
+            ),
+        }
+        for row in values
+    ]
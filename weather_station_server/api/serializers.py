@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from rest_framework.fields import empty
-from .models import WeatherData, Employee, EmployeeCard, EmployeeCardLog, WeatherStation, WorkSpace, WorkTime
+from .models import WeatherData, Employee, EmployeeCard, EmployeeCardLog, WeatherStation, WorkSpace, WorkTime, WeatherStationLatestReading, WorkSpacePresence
 from django.utils import timezone
+from .ingest import save_weather_data
 
 
 class WeatherDataAddSerializer(serializers.ModelSerializer):
@@ -34,10 +35,30 @@ class WeatherDataAddSerializer(serializers.ModelSerializer):
             pressure=validated_data["pressure"],
             date=timezone.now(),
         )
-        weather_data.save()
+        save_weather_data([weather_data])
         return weather_data
 
 
+class WeatherDataUnboundAddSerializer(WeatherDataAddSerializer):
+    """Validates a reading without touching the database.
+
+    The station is validated as a plain UUID and has to be checked by the caller,
+    which lets async views and batch uploads look stations up on their own terms.
+    """
+
+    weather_station = serializers.UUIDField()
+
+
+class WeatherDataBatchItemSerializer(WeatherDataUnboundAddSerializer):
+    """Validates a single reading of a batch upload."""
+
+    date = serializers.DateTimeField()
+
+    class Meta:
+        model = WeatherData
+        fields = ("weather_station", "temperature", "humidity", "pressure", "date")
+
+
 class EmployeeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
@@ -56,12 +77,36 @@ class EmployeeCardLogSerializer(serializers.ModelSerializer):
         fields = ("id", "employee_card", "date", "weather_station")
 
 
+class EmployeeCardLogBatchItemSerializer(serializers.Serializer):
+    """Validates a single swipe of a batch upload from an offline card reader."""
+
+    card_number = serializers.CharField(max_length=50)
+    weather_station = serializers.UUIDField(required=False, allow_null=True)
+    date = serializers.DateTimeField()
+
+
 class WeatherStationSerializer(serializers.ModelSerializer):
     class Meta:
         model = WeatherStation
         fields = ("id", "name", "is_active")
 
 
+class LatestReadingSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(source="weather_data_id")
+
+    class Meta:
+        model = WeatherStationLatestReading
+        fields = ("id", "temperature", "humidity", "pressure", "date")
+
+
+class WeatherStationLatestSerializer(serializers.ModelSerializer):
+    latest_reading = LatestReadingSerializer(allow_null=True, read_only=True)
+
+    class Meta:
+        model = WeatherStation
+        fields = ("id", "name", "is_active", "latest_reading")
+
+
 class WeatherDataSerializer(serializers.ModelSerializer):
     class Meta:
         model = WeatherData
@@ -106,3 +151,23 @@ class WorkTimeSerializer(serializers.ModelSerializer):
     class Meta:
         model = WorkTime
         fields = ("id", "work_space", "employee", "start_date", "end_date", "start_station", "end_station")
+
+
+class WorkSpacePresenceSerializer(serializers.ModelSerializer):
+    employee = EmployeeSerializer()
+
+    class Meta:
+        model = WorkSpacePresence
+        fields = ("work_time", "employee", "start_date")
+
+
+class WorkSpaceOccupancySerializer(serializers.ModelSerializer):
+    employees = WorkSpacePresenceSerializer(source="presence", many=True)
+    count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = WorkSpace
+        fields = ("id", "name", "count", "employees")
+
+    def get_count(self, work_space):
+        return len(work_space.presence.all())
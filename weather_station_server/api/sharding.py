@@ -0,0 +1,126 @@
+"""
+Station-sharded storage of weather data.
+With WEATHER_DATA_SHARDS configured, the readings of a weather station live in the shard
+database picked by a hash of the station id, every shard has its own write lock and
+smaller indexes. Weather stations are copied to every shard (see signals.py) so the
+foreign key holds there, all other models, including the rollups, stay in "default".
+Queries for one station go to its shard, queries across stations run on every shard
+in parallel and their results are merged by date.
+Without shards the readings stay in "default" and nothing runs in threads.
+"""
+
+import heapq
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .models import WeatherData, WeatherStation
+
+_executor = None
+
+
+def shard_aliases():
+    return settings.WEATHER_DATA_SHARDS or [DEFAULT_DB_ALIAS]
+
+
+def shard_for(weather_station_id):
+    """Returns the database alias that stores the readings of a weather station."""
+    aliases = shard_aliases()
+    if len(aliases) == 1:
+        return aliases[0]
+    if not isinstance(weather_station_id, uuid.UUID):
+        weather_station_id = uuid.UUID(str(weather_station_id))
+    return aliases[zlib.crc32(weather_station_id.bytes) % len(aliases)]
+
+
+def is_sharded():
+    return bool(settings.WEATHER_DATA_SHARDS)
+
+
+def weather_data(weather_station_id):
+    """
+    WeatherData queryset on the shard of a weather station, not yet filtered by it.
+    Without shards the database routers pick the database as usual.
+    """
+    if not is_sharded():
+        return WeatherData.objects.all()
+    return WeatherData.objects.using(shard_for(weather_station_id))
+
+
+def group_by_shard(readings):
+    shards = {}
+    for reading in readings:
+        shards.setdefault(shard_for(reading.weather_station_id), []).append(reading)
+    return shards
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=len(shard_aliases()), thread_name_prefix="weather-data-shard"
+        )
+    return _executor
+
+
+def run_on_shard(function, alias):
+    # Worker threads keep their own connections, they never see request_finished.
+    connections[alias].close_if_unusable_or_obsolete()
+    return function(alias)
+
+
+def run_on_shards(function, aliases=None):
+    """
+    Calls function(alias) for every shard and returns the results in alias order.
+    Several shards are queried in parallel threads.
+    """
+    if aliases is None:
+        aliases = shard_aliases()
+    if len(aliases) == 1:
+        return [function(aliases[0])]
+    return list(get_executor().map(partial(run_on_shard, function), aliases))
+
+
+def first_rows(queryset, key, limit, reverse=False, aliases=None):
+    """
+    Returns the first limit rows of an ordered queryset across the shards: every shard
+    returns its first limit rows, which are merged with key, descending if reverse is set.
+    """
+    results = run_on_shards(lambda alias: list(queryset.using(alias)[:limit]), aliases)
+    return list(islice(heapq.merge(*results, key=key, reverse=reverse), limit))
+
+
+def find_weather_data(pk):
+    """Returns the reading with the primary key from whichever shard stores it, or None."""
+    if not is_sharded():
+        return WeatherData.objects.filter(pk=pk).first()
+    for alias in shard_aliases():
+        reading = WeatherData.objects.using(alias).filter(pk=pk).first()
+        if reading is not None:
+            return reading
+    return None
+
+
+def copy_weather_station(weather_station):
+    """Creates or updates the copy of a weather station in every shard, without signals."""
+    values = {
+        field.attname: getattr(weather_station, field.attname)
+        for field in WeatherStation._meta.concrete_fields
+    }
+    for alias in settings.WEATHER_DATA_SHARDS:
+        copies = WeatherStation.objects.using(alias).filter(pk=weather_station.pk)
+        if not copies.update(**values):
+            WeatherStation.objects.using(alias).bulk_create(
+                [WeatherStation(**values)], ignore_conflicts=True
+            )
+
+
+def delete_weather_station(weather_station_id):
+    """Deletes the copies of a weather station, and with them its readings, from every shard."""
+    for alias in settings.WEATHER_DATA_SHARDS:
+        WeatherStation.objects.using(alias).filter(pk=weather_station_id).delete()
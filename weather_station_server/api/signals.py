@@ -0,0 +1,184 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import allowlist, response_cache, sharding
+from .conditional import bump_version
+from .auth_cache import auth_cache
+from .models import (
+    Employee,
+    EmployeeCard,
+    EmployeeCardLog,
+    WeatherData,
+    WeatherStation,
+    WorkSpace,
+    WorkSpacePresence,
+    WorkTime,
+)
+
+
+@receiver(pre_save, sender=EmployeeCard)
+def remember_previous_card_state(sender, instance, **kwargs):
+    previous = (
+        EmployeeCard.objects.filter(pk=instance.pk)
+        .values_list("card_number", "is_active", "employee__is_active")
+        .first()
+    )
+    instance._previous_card_number = None
+    instance._previous_is_allowed = False
+    if previous is not None:
+        instance._previous_card_number = previous[0]
+        instance._previous_is_allowed = allowlist.is_allowed(previous[1], previous[2])
+
+
+@receiver(post_save, sender=EmployeeCard)
+@receiver(post_delete, sender=EmployeeCard)
+def invalidate_card_authorization(sender, instance, using, **kwargs):
+    # After the commit, a swipe running in between would cache the old state again.
+    card_numbers = {instance.card_number}
+    previous_card_number = getattr(instance, "_previous_card_number", None)
+    if previous_card_number is not None:
+        card_numbers.add(previous_card_number)
+
+    def invalidate():
+        for card_number in card_numbers:
+            auth_cache.invalidate_card(card_number)
+
+    transaction.on_commit(invalidate, using=using)
+
+
+@receiver(post_save, sender=EmployeeCard)
+def record_card_allowlist_change(sender, instance, **kwargs):
+    employee_is_active = instance.employee.is_active if instance.employee_id else None
+    now_allowed = allowlist.is_allowed(instance.is_active, employee_is_active)
+    previous_card_number = getattr(instance, "_previous_card_number", None)
+    previous_is_allowed = getattr(instance, "_previous_is_allowed", False)
+    if previous_card_number is not None and previous_card_number != instance.card_number:
+        if previous_is_allowed:
+            allowlist.record_change(previous_card_number, False)
+        if now_allowed:
+            allowlist.record_change(instance.card_number, True)
+    elif now_allowed != previous_is_allowed:
+        allowlist.record_change(instance.card_number, now_allowed)
+
+
+@receiver(post_delete, sender=EmployeeCard)
+def record_card_allowlist_removal(sender, instance, **kwargs):
+    employee_is_active = (
+        Employee.objects.filter(pk=instance.employee_id).values_list("is_active", flat=True).first()
+    )
+    if allowlist.is_allowed(instance.is_active, employee_is_active):
+        allowlist.record_change(instance.card_number, False)
+
+
+@receiver(pre_save, sender=Employee)
+def remember_previous_employee_state(sender, instance, **kwargs):
+    instance._previous_is_active = (
+        Employee.objects.filter(pk=instance.pk).values_list("is_active", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Employee)
+def record_employee_allowlist_change(sender, instance, created, **kwargs):
+    previous_is_active = getattr(instance, "_previous_is_active", None)
+    if created or previous_is_active is None or previous_is_active == instance.is_active:
+        return
+    active_cards = EmployeeCard.objects.filter(employee=instance, is_active=True)
+    for card_number in active_cards.values_list("card_number", flat=True):
+        allowlist.record_change(card_number, instance.is_active)
+
+
+@receiver(post_save, sender=WeatherStation)
+@receiver(post_delete, sender=WeatherStation)
+def invalidate_station_authorization(sender, instance, using, **kwargs):
+    weather_station_id = instance.pk
+    transaction.on_commit(lambda: auth_cache.invalidate_station(weather_station_id), using=using)
+
+
+@receiver(post_save, sender=WeatherStation)
+def copy_weather_station_to_shards(sender, instance, using, **kwargs):
+    if using != DEFAULT_DB_ALIAS or not sharding.is_sharded():
+        return
+    transaction.on_commit(lambda: sharding.copy_weather_station(instance))
+
+
+@receiver(post_delete, sender=WeatherStation)
+def delete_weather_station_from_shards(sender, instance, using, **kwargs):
+    if using != DEFAULT_DB_ALIAS or not sharding.is_sharded():
+        return
+    weather_station_id = instance.pk
+    transaction.on_commit(lambda: sharding.delete_weather_station(weather_station_id))
+
+
+@receiver(post_save, sender=WeatherStation)
+@receiver(post_delete, sender=WeatherStation)
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=EmployeeCard)
+@receiver(post_delete, sender=EmployeeCard)
+def bump_data_version(sender, instance, **kwargs):
+    bump_version(sender._meta.model_name)
+
+
+RESPONSE_CACHE_MODELS = (
+    WeatherData,
+    EmployeeCardLog,
+    WorkTime,
+    WorkSpace,
+    WeatherStation,
+    Employee,
+    EmployeeCard,
+)
+
+
+# Readings and card logs are deleted in bulk, by the retention policy, archiving and
+# cascades, which invalidate the cache themselves. A post_delete receiver would make
+# every such delete load its rows to send the signal instead of a single DELETE.
+FAST_DELETE_MODELS = (WeatherData, EmployeeCardLog)
+
+
+def invalidate_cached_responses(sender, instance, **kwargs):
+    response_cache.invalidate(sender, [instance])
+
+
+for model in RESPONSE_CACHE_MODELS:
+    post_save.connect(invalidate_cached_responses, sender=model)
+    if model not in FAST_DELETE_MODELS:
+        post_delete.connect(invalidate_cached_responses, sender=model)
+
+
+@receiver(post_delete, sender=WeatherStation)
+def invalidate_cached_weather_data(sender, instance, **kwargs):
+    response_cache.invalidate_owner(WeatherData, instance.pk)
+
+
+@receiver(post_delete, sender=EmployeeCard)
+def invalidate_cached_card_logs(sender, instance, **kwargs):
+    response_cache.invalidate_owner(EmployeeCardLog, instance.pk)
+
+
+@receiver(post_save, sender=WorkTime)
+def update_work_space_presence(sender, instance, **kwargs):
+    if instance.end_date is not None:
+        WorkSpacePresence.objects.filter(work_time=instance).delete()
+        return
+    presence = {
+        "work_space_id": instance.work_space_id,
+        "employee_id": instance.employee_id,
+        "start_date": instance.start_date,
+    }
+    if kwargs["created"]:
+        WorkSpacePresence.objects.create(work_time=instance, **presence)
+    else:
+        WorkSpacePresence.objects.update_or_create(work_time=instance, defaults=presence)
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,58 @@
+"""
+Streaming exports of weather data.
+Rows are read with values_list().iterator(), so memory use stays flat no matter
+how long the requested range is.
+"""
+
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.fields import DateTimeField
+
+from .renderers import CSVRenderer, NDJSONRenderer
+
+EXPORT_FORMATS = (NDJSONRenderer.format, CSVRenderer.format)
+EXPORT_RENDERERS = [NDJSONRenderer, CSVRenderer]
+WEATHER_DATA_FIELDS = ("id", "weather_station", "temperature", "humidity", "pressure", "date")
+WEATHER_DATA_COLUMNS = ("id", "weather_station_id", "temperature", "humidity", "pressure", "date")
+CHUNK_SIZE = 2000
+
+format_datetime = DateTimeField().to_representation
+
+
+class Echo:
+    """File-like object that hands back what the csv writer writes."""
+
+    def write(self, value):
+        return value
+
+
+def iter_weather_data(queryset):
+    return queryset.values_list(*WEATHER_DATA_COLUMNS).iterator(chunk_size=CHUNK_SIZE)
+
+
+def as_output_row(row):
+    return (str(row[0]), str(row[1]), row[2], row[3], row[4], format_datetime(row[5]))
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(WEATHER_DATA_FIELDS, as_output_row(row)))) + "\n"
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(WEATHER_DATA_FIELDS)
+    for row in rows:
+        yield writer.writerow(as_output_row(row))
+
+
+def stream_weather_data(rows, export_format, filename):
+    """Returns a StreamingHttpResponse with the weather data rows in the given format."""
+    if export_format == CSVRenderer.format:
+        response = StreamingHttpResponse(csv_lines(rows), content_type=CSVRenderer.media_type)
+    else:
+        response = StreamingHttpResponse(ndjson_lines(rows), content_type=NDJSONRenderer.media_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{export_format}"'
+    return response
@@ -0,0 +1,128 @@
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from api import archive
+from api.models import WeatherData, WeatherDataArchive, WeatherStation
+
+NOW = datetime(2026, 6, 15, 12, tzinfo=dt_timezone.utc)
+
+
+class ArchiveTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        archive_settings = override_settings(
+            WEATHER_ARCHIVE={**settings.WEATHER_ARCHIVE, "PATH": directory.name}
+        )
+        archive_settings.enable()
+        self.addCleanup(archive_settings.disable)
+
+    def add_readings(self, weather_station, dates):
+        return WeatherData.objects.bulk_create(
+            WeatherData(
+                weather_station=weather_station,
+                temperature=20 + index / 10,
+                humidity=50,
+                pressure=1013.25,
+                date=date,
+            )
+            for index, date in enumerate(dates)
+        )
+
+
+class ArchiveMonthTests(ArchiveTestCase):
+    def test_append_to_month(self):
+        weather_station = WeatherStation.objects.create(name="Station")
+        day = datetime(2026, 1, 10, tzinfo=dt_timezone.utc)
+        self.add_readings(weather_station, [day, day, day + timedelta(days=5)])
+        archive.archive_weather_data(datetime(2026, 1, 20, tzinfo=dt_timezone.utc))
+        first = WeatherDataArchive.objects.get()
+        archived = list(archive.iter_archived(weather_station.id, descending=False))
+
+        # A late reading of the same month, one at a timestamp that is archived already.
+        self.add_readings(weather_station, [day - timedelta(days=1), day])
+        archive.archive_weather_data(datetime(2026, 1, 20, tzinfo=dt_timezone.utc))
+
+        month = WeatherDataArchive.objects.get()
+        self.assertNotEqual(month.file_name, first.file_name)
+        self.assertEqual(month.count, 5)
+        self.assertEqual(month.start_date, day - timedelta(days=1))
+        self.assertEqual(month.end_date, day + timedelta(days=5))
+        self.assertFalse(WeatherData.objects.exists())
+        rows = list(archive.iter_archived(weather_station.id, descending=False))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(
+            [row[archive.DATE_COLUMN] for row in rows],
+            [day - timedelta(days=1), day, day, day, day + timedelta(days=5)],
+        )
+        # Readings that were archived before keep their ids.
+        by_id = {row[0]: row for row in rows}
+        self.assertEqual(len(by_id), 5)
+        for row in archived:
+            self.assertEqual(by_id[row[0]], row)
+
+    def test_values_survive_archiving(self):
+        weather_station = WeatherStation.objects.create(name="Station")
+        readings = self.add_readings(
+            weather_station, [NOW - timedelta(days=200, minutes=i) for i in range(50)]
+        )
+        archive.archive_weather_data(NOW - timedelta(days=100))
+        expected = sorted(
+            (reading.date, reading.temperature, reading.humidity, reading.pressure)
+            for reading in readings
+        )
+        rows = archive.iter_archived(weather_station.id, descending=False)
+        self.assertEqual([(row[5], row[2], row[3], row[4]) for row in rows], expected)
+
+
+class ArchivePaginationTests(ArchiveTestCase):
+    """The weather data pages walk from live into archived readings without gaps or repeats."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.weather_station = WeatherStation.objects.create(name="Station")
+
+    def setUp(self):
+        super().setUp()
+        dates = []
+        for i in range(40):
+            date = NOW - timedelta(days=3 * i)
+            # Every fifth reading has a twin with the same timestamp.
+            dates += [date, date] if i % 5 == 0 else [date]
+        self.add_readings(self.weather_station, dates)
+        archive.archive_weather_data(NOW - timedelta(days=50))
+        live = WeatherData.objects.values_list("date", "id")
+        archived = [(row[5], row[0]) for row in archive.iter_archived()]
+        self.assertTrue(live and archived)
+        self.expected = [str(id) for _, id in sorted([*live, *archived], reverse=True)]
+
+    def walk(self, url, link):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = [row["id"] for row in response.json()["results"]]
+            pages.append(page)
+            url = response.json()[link]
+        return pages
+
+    def test_next_pages(self):
+        pages = self.walk("/api/weather_data/?page_size=4", "next")
+        self.assertEqual([id for page in pages for id in page], self.expected)
+
+    def test_previous_pages(self):
+        pages = self.walk("/api/weather_data/?page_size=4", "next")
+        url = self.client.get("/api/weather_data/?page_size=4").json()["next"]
+        for _ in range(len(pages) - 2):
+            url = self.client.get(url).json()["next"]
+        back = self.walk(url, "previous")
+        self.assertEqual([id for page in reversed(back) for id in page], self.expected)
+
+    def test_station_filter(self):
+        pages = self.walk(
+            f"/api/weather_data/?page_size=7&weather_station={self.weather_station.id}", "next"
+        )
+        self.assertEqual([id for page in pages for id in page], self.expected)
@@ -0,0 +1,42 @@
+import random
+import uuid
+from datetime import timedelta
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from api.downsampling import downsample_rows
+from api.streaming import WEATHER_DATA_COLUMNS
+
+
+class DownsampleRowsTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        rng = random.Random(0)
+        now = timezone.now()
+        weather_station_id = uuid.uuid4()
+        cls.rows = []
+        for i in range(20000):
+            values = {
+                "id": uuid.uuid4(),
+                "weather_station_id": weather_station_id,
+                "temperature": rng.gauss(20, 5),
+                "humidity": rng.gauss(50, 10),
+                "pressure": rng.gauss(1000, 20),
+                "date": now + timedelta(seconds=i),
+            }
+            cls.rows.append(tuple(values[column] for column in WEATHER_DATA_COLUMNS))
+
+    def test_keeps_at_most_max_points(self):
+        for max_points in (3, 8, 9, 100, 1000):
+            with self.subTest(max_points=max_points):
+                self.assertLessEqual(len(downsample_rows(self.rows, max_points)), max_points)
+
+    def test_keeps_first_and_last_reading(self):
+        rows = downsample_rows(self.rows, 1000)
+        self.assertEqual(rows[0], self.rows[0])
+        self.assertEqual(rows[-1], self.rows[-1])
+
+    def test_short_series_is_unchanged(self):
+        self.assertEqual(downsample_rows(self.rows[:50], 100), self.rows[:50])
@@ -0,0 +1,83 @@
+import math
+import random
+import struct
+from unittest import TestCase
+
+from api.gorilla import (
+    XOR_ENCODED,
+    decode_timestamps,
+    decode_values,
+    encode_timestamps,
+    encode_values,
+)
+
+
+def bits(values):
+    """The IEEE 754 representations, which tell -0.0 from 0.0 and compare NaN equal."""
+    return [struct.pack(">d", value) for value in values]
+
+
+class ValueCodecTests(TestCase):
+    def assertRoundTrip(self, values):
+        data = encode_values(values)
+        self.assertEqual(bits(decode_values(data, len(values))), bits(values))
+        return data
+
+    def test_fixed_resolution(self):
+        data = self.assertRoundTrip([21.5, 21.5, 21.6, 21.4, -3.25, 0.0, 1013.25])
+        self.assertEqual(data[0], 2)
+
+    def test_repeated_values(self):
+        self.assertRoundTrip([1013.2] * 100)
+        self.assertRoundTrip([math.pi] * 100)
+
+    def test_arbitrary_floats(self):
+        data = self.assertRoundTrip([0.1 + 0.2, math.pi, math.e, 1e-300, -1e300, 2.0**-1074])
+        self.assertEqual(data[0], XOR_ENCODED)
+
+    def test_random_walk(self):
+        generator = random.Random(0)
+        values = [20.0]
+        for _ in range(2000):
+            values.append(values[-1] + generator.gauss(0, 0.5))
+        self.assertRoundTrip(values)
+        self.assertRoundTrip([round(value, 1) for value in values])
+
+    def test_special_values(self):
+        for values in (
+            [-0.0],
+            [0.0, -0.0, 0.0],
+            [20.5, math.inf, -math.inf, 20.5],
+            [math.nan, 1.0, math.nan, math.nan],
+            [-0.0, math.nan, math.inf, 3.5, 3.5],
+        ):
+            with self.subTest(values=values):
+                data = self.assertRoundTrip(values)
+                self.assertEqual(data[0], XOR_ENCODED)
+
+    def test_empty(self):
+        self.assertEqual(decode_values(encode_values([]), 0), [])
+
+
+class TimestampCodecTests(TestCase):
+    def assertRoundTrip(self, timestamps):
+        self.assertEqual(decode_timestamps(encode_timestamps(timestamps), len(timestamps)), timestamps)
+
+    def test_regular_interval(self):
+        start = 1_700_000_000_000_000
+        self.assertRoundTrip([start + i * 60_000_000 for i in range(500)])
+
+    def test_duplicate_timestamps(self):
+        self.assertRoundTrip([5, 5, 5, 6, 6, 100, 100, 100, 100])
+        self.assertRoundTrip([1_700_000_000_000_000] * 10)
+
+    def test_every_delta_of_delta_bucket(self):
+        deltas = [0, 1, -64, 63, 64, -256, 255, 256, -2048, 2047, 2048, 2**31, -(2**31), 2**40]
+        timestamps = [1_700_000_000_000_000]
+        for delta in deltas:
+            timestamps.append(timestamps[-1] + delta)
+        self.assertRoundTrip(timestamps)
+
+    def test_negative_and_empty(self):
+        self.assertRoundTrip([-10, -5, 0, 5])
+        self.assertRoundTrip([])
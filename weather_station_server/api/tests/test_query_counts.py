@@ -0,0 +1,204 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.models import (
+    Employee,
+    EmployeeCard,
+    EmployeeCardLog,
+    WeatherData,
+    WeatherStation,
+    WeatherStationLatestReading,
+    WorkSpace,
+    WorkSpacePresence,
+    WorkTime,
+)
+
+# Queries per request of the list endpoints. They must not grow with the number of rows,
+# raise one only together with the change that needs the extra query.
+QUERY_BUDGETS = {
+    # page, archive files
+    "weather_data": 2,
+    "employee_card_log": 1,
+    "work_space": 1,
+    # ETag validators (2), station, readings, archive files
+    "weather_station_data": 5,
+    # card with employee, card logs
+    "employee_card_data": 2,
+    "weather_station_latest": 1,
+    # ETag validator, list
+    "weather_station": 2,
+    "employee": 2,
+    "employee_card": 2,
+    # work spaces, presence with employees
+    "work_space_occupancy": 2,
+}
+
+# Counted on the primary, also when DATABASE_REPLICA_URL is set.
+primary_only = override_settings(REPLICA={**settings.REPLICA, "ENABLED": False})
+
+
+class QueryCountTests:
+    """Requests every list endpoint with self.rows rows in its table."""
+
+    rows = None
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        weather_stations = WeatherStation.objects.bulk_create(
+            WeatherStation(name=f"Station {i}") for i in range(cls.rows)
+        )
+        cls.weather_station = weather_stations[0]
+        readings = WeatherData.objects.bulk_create(
+            (
+                WeatherData(
+                    weather_station=cls.weather_station,
+                    temperature=20,
+                    humidity=50,
+                    pressure=1000,
+                    date=now - timedelta(minutes=i),
+                )
+                for i in range(cls.rows)
+            ),
+            batch_size=1000,
+        )
+        WeatherStationLatestReading.objects.bulk_create(
+            (
+                WeatherStationLatestReading(
+                    weather_station=weather_station,
+                    weather_data_id=readings[0].id,
+                    temperature=20,
+                    humidity=50,
+                    pressure=1000,
+                    date=now,
+                )
+                for weather_station in weather_stations
+            ),
+            batch_size=1000,
+        )
+        employees = Employee.objects.bulk_create(
+            (
+                Employee(name="Jan", surname=f"Kowalski {i}", phone_number=str(i))
+                for i in range(cls.rows)
+            ),
+            batch_size=1000,
+        )
+        employee = employees[0]
+        employee_cards = EmployeeCard.objects.bulk_create(
+            (
+                EmployeeCard(card_number=str(i), employee=employee)
+                for i, employee in enumerate(employees)
+            ),
+            batch_size=1000,
+        )
+        cls.employee_card = employee_cards[0]
+        EmployeeCardLog.objects.bulk_create(
+            (
+                EmployeeCardLog(
+                    employee_card=cls.employee_card,
+                    weather_station=cls.weather_station,
+                    date=now - timedelta(minutes=i),
+                )
+                for i in range(cls.rows)
+            ),
+            batch_size=1000,
+        )
+        work_space = WorkSpace.objects.create(
+            name="Hall", start_station=weather_stations[0], end_station=weather_stations[-1]
+        )
+        WorkTime.objects.bulk_create(
+            (
+                WorkTime(
+                    employee=employee,
+                    work_space=work_space,
+                    start_station=weather_stations[0],
+                    end_station=weather_stations[-1],
+                    start_date=now - timedelta(hours=i + 1),
+                    end_date=now - timedelta(hours=i),
+                )
+                for i in range(cls.rows)
+            ),
+            batch_size=1000,
+        )
+        # Every employee is at work, the presence rows are kept by signals bulk_create skips.
+        open_work_times = WorkTime.objects.bulk_create(
+            (
+                WorkTime(
+                    employee=employee,
+                    work_space=work_space,
+                    start_station=weather_stations[0],
+                    start_date=now,
+                )
+                for employee in employees
+            ),
+            batch_size=1000,
+        )
+        WorkSpacePresence.objects.bulk_create(
+            (
+                WorkSpacePresence(
+                    work_time=work_time,
+                    work_space=work_space,
+                    employee_id=work_time.employee_id,
+                    start_date=now,
+                )
+                for work_time in open_work_times
+            ),
+            batch_size=1000,
+        )
+
+    def assertWithinBudget(self, name, url):
+        with self.assertNumQueries(QUERY_BUDGETS[name]):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_weather_data(self):
+        self.assertWithinBudget("weather_data", "/api/weather_data/")
+
+    def test_employee_card_log(self):
+        self.assertWithinBudget("employee_card_log", "/api/employee_card_log/")
+
+    def test_work_space(self):
+        self.assertWithinBudget("work_space", "/api/work_space/")
+
+    def test_weather_station_data(self):
+        self.assertWithinBudget(
+            "weather_station_data", f"/api/weather_station/{self.weather_station.id}/data/"
+        )
+
+    def test_employee_card_data(self):
+        self.assertWithinBudget(
+            "employee_card_data", f"/api/employee_card/{self.employee_card.id}/data"
+        )
+
+    def test_weather_station_latest(self):
+        self.assertWithinBudget("weather_station_latest", "/api/weather_station/latest/")
+
+    def test_weather_station(self):
+        self.assertWithinBudget("weather_station", "/api/weather_station/")
+
+    def test_employee(self):
+        self.assertWithinBudget("employee", "/api/employee/")
+
+    def test_employee_card(self):
+        self.assertWithinBudget("employee_card", "/api/employee_card/")
+
+    def test_work_space_occupancy(self):
+        self.assertWithinBudget("work_space_occupancy", "/api/work_space/occupancy/")
+
+
+@primary_only
+class TenRowsQueryCountTests(QueryCountTests, TestCase):
+    rows = 10
+
+
+@primary_only
+class ThousandRowsQueryCountTests(QueryCountTests, TestCase):
+    rows = 1000
+
+
+@primary_only
+class TenThousandRowsQueryCountTests(QueryCountTests, TestCase):
+    rows = 10000
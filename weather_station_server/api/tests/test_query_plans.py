@@ -0,0 +1,128 @@
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import (
+    Employee,
+    EmployeeCard,
+    EmployeeCardLog,
+    WeatherData,
+    WeatherStation,
+    WorkSpace,
+    WorkTime,
+)
+
+
+@skipUnless(connection.vendor == "sqlite", "Reads SQLite query plans")
+@override_settings(REPLICA={**settings.REPLICA, "ENABLED": False})
+class TimeRangeIndexTests(TestCase):
+    """The keyset pages of the list endpoints are read in index order, without sorting."""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.weather_station = WeatherStation.objects.create(name="Station")
+        employee = Employee.objects.create(name="Jan", surname="Kowalski", phone_number="1")
+        cls.employee = employee
+        cls.employee_card = EmployeeCard.objects.create(card_number="1", employee=employee)
+        work_space = WorkSpace.objects.create(
+            name="Hall", start_station=cls.weather_station, end_station=cls.weather_station
+        )
+        WeatherData.objects.bulk_create(
+            WeatherData(
+                weather_station=cls.weather_station,
+                temperature=20,
+                humidity=50,
+                pressure=1000,
+                date=now - timedelta(minutes=i),
+            )
+            for i in range(5)
+        )
+        EmployeeCardLog.objects.bulk_create(
+            EmployeeCardLog(employee_card=cls.employee_card, date=now - timedelta(minutes=i))
+            for i in range(5)
+        )
+        WorkTime.objects.bulk_create(
+            WorkTime(
+                employee=employee,
+                work_space=work_space,
+                start_date=now - timedelta(days=i + 1),
+                end_date=now - timedelta(days=i),
+            )
+            for i in range(5)
+        )
+
+    def get_plans(self, url, table, pages):
+        """Returns the query plans of the queries on table, following the next link for pages pages."""
+        plans = []
+        for _ in range(pages):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page_queries = [
+                query["sql"]
+                for query in queries
+                if f'FROM "{table}"' in query["sql"] and "ORDER BY" in query["sql"]
+            ]
+            self.assertTrue(page_queries, f"no page query on {table} for {url}")
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + page_queries[0])
+                plans.append(" / ".join(row[-1] for row in cursor.fetchall()))
+            if pages > 1:
+                url = response.json()["next"]
+        return plans
+
+    def assertReadInIndexOrder(self, url, table, index, pages=2):
+        for plan in self.get_plans(url, table, pages):
+            self.assertIn(index, plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_weather_data(self):
+        self.assertReadInIndexOrder(
+            "/api/weather_data/?page_size=2", "api_weatherdata", "weatherdata_date_idx"
+        )
+
+    def test_weather_data_of_station(self):
+        self.assertReadInIndexOrder(
+            f"/api/weather_data/?page_size=2&weather_station={self.weather_station.id}",
+            "api_weatherdata",
+            "weatherdata_station_date_idx",
+        )
+
+    def test_weather_station_data(self):
+        self.assertReadInIndexOrder(
+            f"/api/weather_station/{self.weather_station.id}/data/",
+            "api_weatherdata",
+            "weatherdata_station_date_idx",
+            pages=1,
+        )
+
+    def test_employee_card_log(self):
+        self.assertReadInIndexOrder(
+            "/api/employee_card_log/?page_size=2", "api_employeecardlog", "cardlog_date_idx"
+        )
+
+    def test_employee_card_data(self):
+        self.assertReadInIndexOrder(
+            f"/api/employee_card/{self.employee_card.id}/data",
+            "api_employeecardlog",
+            "cardlog_card_date_idx",
+            pages=1,
+        )
+
+    def test_work_time(self):
+        self.assertReadInIndexOrder(
+            "/api/work_space/?page_size=2", "api_worktime", "worktime_start_idx"
+        )
+
+    def test_work_time_of_employee(self):
+        self.assertReadInIndexOrder(
+            f"/api/work_space/?page_size=2&employee={self.employee.id}",
+            "api_worktime",
+            "worktime_employee_start_idx",
+        )
@@ -0,0 +1,67 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api import response_cache
+from api.models import EmployeeCard, EmployeeCardLog, WeatherData, WeatherStation
+
+RESPONSE_CACHE = {
+    "ENABLED": True,
+    "TIMEOUT": 300,
+    "HISTORY_TIMEOUT": 300,
+    "CACHE_ALIAS": "default",
+}
+
+
+@override_settings(RESPONSE_CACHE=RESPONSE_CACHE)
+class ResponseCacheInvalidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.weather_station = WeatherStation.objects.create(name="Station")
+        cls.employee_card = EmployeeCard.objects.create(card_number="1")
+        WeatherData.objects.bulk_create(
+            WeatherData(
+                weather_station=cls.weather_station,
+                temperature=20,
+                humidity=50,
+                pressure=1000,
+                date=timezone.now(),
+            )
+            for _ in range(3)
+        )
+        EmployeeCardLog.objects.bulk_create(
+            EmployeeCardLog(employee_card=cls.employee_card, date=timezone.now()) for _ in range(3)
+        )
+
+    def get_generation(self, name, owner):
+        return response_cache.get_generations([response_cache.data_scope(name, owner)])[0]
+
+    def test_readings_and_card_logs_are_fast_deleted(self):
+        # A single DELETE, the rows are not loaded to send signals.
+        with self.assertNumQueries(1):
+            WeatherData.objects.filter(weather_station=self.weather_station).delete()
+        with self.assertNumQueries(1):
+            EmployeeCardLog.objects.filter(employee_card=self.employee_card).delete()
+
+    def test_saving_a_reading_invalidates_its_station(self):
+        generation = self.get_generation("weatherdata", self.weather_station.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            WeatherData.objects.create(
+                weather_station=self.weather_station,
+                temperature=20,
+                humidity=50,
+                pressure=1000,
+                date=timezone.now(),
+            )
+        self.assertNotEqual(self.get_generation("weatherdata", self.weather_station.pk), generation)
+
+    def test_deleting_a_station_invalidates_its_readings(self):
+        generation = self.get_generation("weatherdata", self.weather_station.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.weather_station.delete()
+        self.assertNotEqual(self.get_generation("weatherdata", self.weather_station.pk), generation)
+
+    def test_deleting_a_card_invalidates_its_logs(self):
+        generation = self.get_generation("employeecardlog", self.employee_card.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee_card.delete()
+        self.assertNotEqual(self.get_generation("employeecardlog", self.employee_card.pk), generation)
@@ -0,0 +1,56 @@
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api import archive, retention
+from api.models import EmployeeCard, EmployeeCardLog, WeatherData, WeatherStation
+
+
+class BulkDeleteTests(TestCase):
+    """Retention and archiving remove readings and card logs in batches of plain DELETEs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.weather_station = WeatherStation.objects.create(name="Station")
+        cls.employee_card = EmployeeCard.objects.create(card_number="1")
+        WeatherData.objects.bulk_create(
+            WeatherData(
+                weather_station=cls.weather_station,
+                temperature=20,
+                humidity=50,
+                pressure=1000,
+                date=now - timedelta(days=days),
+            )
+            for days in (1, 2, 200, 201, 202)
+        )
+        EmployeeCardLog.objects.bulk_create(
+            EmployeeCardLog(employee_card=cls.employee_card, date=now - timedelta(days=days))
+            for days in (1, 200, 201)
+        )
+
+    def test_delete_expired(self):
+        before = timezone.now() - timedelta(days=100)
+        with CaptureQueriesContext(connection) as queries:
+            deleted = retention.delete_expired("weather_data", before, batch_size=1)
+        self.assertEqual(deleted, 3)
+        statements = [query["sql"].split(" ", 1)[0] for query in queries]
+        self.assertEqual(statements.count("DELETE"), 3)
+        # Only the ids, dates and stations are read, the readings are not loaded for signals.
+        self.assertFalse([query for query in queries if '"temperature"' in query["sql"]])
+        self.assertEqual(WeatherData.objects.count(), 2)
+        self.assertEqual(retention.delete_expired("employee_card_log", before, batch_size=10), 2)
+        self.assertEqual(EmployeeCardLog.objects.count(), 1)
+
+    def test_archive_weather_data(self):
+        with tempfile.TemporaryDirectory() as path:
+            with override_settings(WEATHER_ARCHIVE={**settings.WEATHER_ARCHIVE, "PATH": path}):
+                archived, _ = archive.archive_weather_data(timezone.now() - timedelta(days=100))
+                self.assertEqual(archived, 3)
+                self.assertEqual(WeatherData.objects.count(), 2)
+                self.assertEqual(len(list(archive.iter_archived(self.weather_station.id))), 3)
@@ -0,0 +1,94 @@
+import time
+from unittest import mock
+
+from django.db import router
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.models import WeatherData
+from api.routers import REPLICA, ReplicaReadMixin, ReplicaStickinessMiddleware, use_replica
+
+REPLICA_SETTINGS = {"ENABLED": True, "STICKY_SECONDS": 5, "COOKIE_NAME": "replica_sticky"}
+
+
+class ProbeView(ReplicaReadMixin, APIView):
+    """Answers with the database the view would read WeatherData from."""
+
+    def get(self, request):
+        return Response({"db": WeatherData.objects.all().db})
+
+    def post(self, request):
+        return Response({"db": WeatherData.objects.all().db})
+
+
+class StreamingProbeView(ReplicaReadMixin, APIView):
+    """Streams the database WeatherData is read from while the response is iterated."""
+
+    def get(self, request):
+        return StreamingHttpResponse(WeatherData.objects.all().db for _ in range(2))
+
+
+@override_settings(DATABASE_ROUTERS=["api.routers.ReplicaRouter"], REPLICA=REPLICA_SETTINGS)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.handler = ReplicaStickinessMiddleware(ProbeView.as_view())
+
+    def request(self, method, cookies=None, remote_addr="10.0.0.1"):
+        request = getattr(self.factory, method)("/probe/", REMOTE_ADDR=remote_addr)
+        request.COOKIES.update(cookies or {})
+        response = self.handler(request)
+        response.render()
+        return response
+
+    def cookies(self, response):
+        return {name: morsel.value for name, morsel in response.cookies.items()}
+
+    def test_router(self):
+        self.assertEqual(router.db_for_read(WeatherData), "default")
+        self.assertEqual(router.db_for_write(WeatherData), "default")
+        token = use_replica.set(True)
+        try:
+            self.assertEqual(router.db_for_read(WeatherData), REPLICA)
+            self.assertEqual(router.db_for_write(WeatherData), "default")
+        finally:
+            use_replica.reset(token)
+
+    def test_reads_go_to_the_replica(self):
+        response = self.request("get")
+        self.assertEqual(response.data["db"], REPLICA)
+        self.assertFalse(response.cookies)
+
+    def test_writes_go_to_the_primary(self):
+        response = self.request("post")
+        self.assertEqual(response.data["db"], "default")
+        self.assertIn("replica_sticky", response.cookies)
+        self.assertEqual(response.cookies["replica_sticky"]["max-age"], 5)
+
+    def test_reads_after_a_write_stick_to_the_primary(self):
+        cookies = self.cookies(self.request("post"))
+        self.assertEqual(self.request("get", cookies).data["db"], "default")
+
+    def test_stickiness_expires(self):
+        cookies = self.cookies(self.request("post"))
+        with mock.patch("time.time", return_value=time.time() + 6):
+            self.assertEqual(self.request("get", cookies).data["db"], REPLICA)
+
+    def test_stickiness_is_per_client(self):
+        self.request("post", remote_addr="10.0.0.1")
+        # Another client behind the same NAT still reads from the replica.
+        self.assertEqual(self.request("get", remote_addr="10.0.0.1").data["db"], REPLICA)
+
+    def test_streamed_responses_read_from_the_replica(self):
+        response = StreamingProbeView.as_view()(self.factory.get("/probe/"))
+        self.assertEqual(b"".join(response.streaming_content), b"replicareplica")
+
+    def test_forged_mark_is_ignored(self):
+        self.assertEqual(self.request("get", {"replica_sticky": "1"}).data["db"], REPLICA)
+
+    @override_settings(REPLICA={**REPLICA_SETTINGS, "ENABLED": False})
+    def test_without_replica(self):
+        self.assertEqual(self.request("get").data["db"], "default")
+        self.assertFalse(self.request("post").cookies)
@@ -0,0 +1,159 @@
+import copy
+import uuid
+import zlib
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api import sharding
+from api.models import WeatherData, WeatherStation, WeatherStationLatestReading
+
+SHARD = "shard_test"
+SHARDS = [DEFAULT_DB_ALIAS, SHARD]
+
+# A second SQLite database. Registered on import, before the test runner creates the test
+# databases, so it gets an in-memory test database with every migration applied.
+if connection.vendor == "sqlite":
+    connections.settings[SHARD] = {
+        **copy.deepcopy(connections.settings[DEFAULT_DB_ALIAS]),
+        "NAME": f"{SHARD}.sqlite3",
+    }
+
+
+class SerialExecutor:
+    """
+    Stands in for the shard thread pool. Worker threads open their own connections,
+    which cannot see the rows of the test's transaction.
+    """
+
+    def map(self, function, *iterables):
+        return map(function, *iterables)
+
+
+def station_on(alias):
+    """A weather station id that hashes to the alias."""
+    while True:
+        weather_station_id = uuid.uuid4()
+        if SHARDS[zlib.crc32(weather_station_id.bytes) % len(SHARDS)] == alias:
+            return weather_station_id
+
+
+@skipUnless(connection.vendor == "sqlite", "Adds an in-memory SQLite shard")
+@override_settings(WEATHER_DATA_SHARDS=SHARDS)
+@mock.patch.object(sharding, "get_executor", SerialExecutor)
+class ShardingTests(TestCase):
+    """Readings of two stations, one in "default" and one in a second SQLite database."""
+
+    databases = {DEFAULT_DB_ALIAS, SHARD} & set(connections)
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first = WeatherStation.objects.create(
+                id=station_on(DEFAULT_DB_ALIAS), name="First"
+            )
+            self.second = WeatherStation.objects.create(id=station_on(SHARD), name="Second")
+        self.now = timezone.now()
+
+    def readings(self, weather_station, minutes):
+        return [
+            WeatherData(
+                weather_station_id=weather_station.id,
+                temperature=20,
+                humidity=50,
+                pressure=1000,
+                date=self.now - timedelta(minutes=minute),
+            )
+            for minute in minutes
+        ]
+
+    def ids(self, alias, weather_station):
+        return set(
+            WeatherData.objects.using(alias)
+            .filter(weather_station=weather_station)
+            .values_list("id", flat=True)
+        )
+
+    def test_shard_for(self):
+        for weather_station in (self.first, self.second):
+            alias = SHARDS[zlib.crc32(weather_station.id.bytes) % len(SHARDS)]
+            self.assertEqual(sharding.shard_for(weather_station.id), alias)
+            self.assertEqual(sharding.shard_for(str(weather_station.id)), alias)
+        self.assertEqual(sharding.shard_for(self.first.id), DEFAULT_DB_ALIAS)
+        self.assertEqual(sharding.shard_for(self.second.id), SHARD)
+
+    def test_stations_are_copied_on_commit(self):
+        self.assertTrue(WeatherStation.objects.using(SHARD).filter(id=self.second.id).exists())
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.second.name = "Renamed"
+            self.second.save()
+        # Nothing reaches the shard before the station commits.
+        self.assertEqual(WeatherStation.objects.using(SHARD).get(id=self.second.id).name, "Second")
+        for callback in callbacks:
+            callback()
+        self.assertEqual(WeatherStation.objects.using(SHARD).get(id=self.second.id).name, "Renamed")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.second.delete()
+        self.assertFalse(WeatherStation.objects.using(SHARD).filter(id=self.second.id).exists())
+
+    def test_ingest_routing(self):
+        for weather_station in (self.first, self.second):
+            response = self.client.post(
+                "/api/send_weather_data/",
+                {
+                    "weather_station": str(weather_station.id),
+                    "temperature": 21.5,
+                    "humidity": 40,
+                    "pressure": 1000,
+                },
+            )
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.ids(DEFAULT_DB_ALIAS, self.first)), 1)
+        self.assertEqual(len(self.ids(SHARD, self.second)), 1)
+        self.assertFalse(self.ids(DEFAULT_DB_ALIAS, self.second))
+        self.assertFalse(self.ids(SHARD, self.first))
+        # Everything derived from the readings stays in "default".
+        self.assertEqual(WeatherStationLatestReading.objects.using(DEFAULT_DB_ALIAS).count(), 2)
+
+    def test_page_merge(self):
+        readings = self.readings(self.first, range(0, 30, 2))
+        readings += self.readings(self.second, range(1, 30, 2))
+        # Two readings at the same time in different shards, ordered by id.
+        readings += self.readings(self.first, [7]) + self.readings(self.second, [7])
+        for alias, shard_readings in sharding.group_by_shard(readings).items():
+            WeatherData.objects.using(alias).bulk_create(shard_readings)
+        expected = sorted(((reading.date, reading.id) for reading in readings), reverse=True)
+
+        queryset = WeatherData.objects.order_by("-date", "-id")
+        rows = sharding.first_rows(
+            queryset, lambda reading: (reading.date, reading.id), 10, reverse=True
+        )
+        self.assertEqual([(row.date, row.id) for row in rows], expected[:10])
+
+        url, ids = "/api/weather_data/?page_size=4", []
+        while url:
+            page = self.client.get(url).json()
+            ids += [row["id"] for row in page["results"]]
+            url = page["next"]
+        self.assertEqual(ids, [str(id) for _, id in expected])
+
+    def test_reshard(self):
+        # Readings of the second station written before the shard was added, and one batch
+        # a previous, interrupted run already copied to the shard.
+        readings = WeatherData.objects.using(DEFAULT_DB_ALIAS).bulk_create(
+            self.readings(self.second, range(7))
+        )
+        WeatherData.objects.using(SHARD).bulk_create(
+            sorted(readings, key=lambda reading: reading.id)[:2]
+        )
+
+        call_command("shard_weather_data", batch_size=2, stdout=mock.MagicMock())
+
+        self.assertFalse(self.ids(DEFAULT_DB_ALIAS, self.second))
+        self.assertEqual(self.ids(SHARD, self.second), {reading.id for reading in readings})
+        # Running it again has nothing left to move.
+        call_command("shard_weather_data", stdout=mock.MagicMock())
+        self.assertEqual(self.ids(SHARD, self.second), {reading.id for reading in readings})
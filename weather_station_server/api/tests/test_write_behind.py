@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.db import IntegrityError, OperationalError
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import EmployeeCard, EmployeeCardLog
+from api.write_behind import WriteBehindBuffer
+
+
+@mock.patch.object(WriteBehindBuffer, "_start")
+class WriteBehindBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee_card = EmployeeCard.objects.create(card_number="1")
+
+    def make_buffer(self, **kwargs):
+        return WriteBehindBuffer(flush_interval_ms=1, stop_timeout_ms=20, **kwargs)
+
+    def log(self):
+        return EmployeeCardLog(employee_card=self.employee_card, date=timezone.now())
+
+    def test_flush(self, _start):
+        buffer = self.make_buffer()
+        self.assertTrue(buffer.append(self.log()))
+        self.assertTrue(buffer.append(self.log()))
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(buffer.depth, 0)
+        self.assertEqual(EmployeeCardLog.objects.count(), 2)
+
+    def test_queue_is_bounded(self, _start):
+        buffer = self.make_buffer(max_pending=2)
+        self.assertTrue(buffer.append(self.log()))
+        self.assertTrue(buffer.append(self.log()))
+        self.assertFalse(buffer.append(self.log()))
+        self.assertEqual(buffer.depth, 2)
+
+    def test_unavailable_database_requeues_the_batch(self, _start):
+        buffer = self.make_buffer()
+        buffer.append(self.log())
+        buffer.append(self.log())
+        with mock.patch.object(buffer, "_save", side_effect=OperationalError) as save:
+            with self.assertLogs("api.write_behind", "ERROR"):
+                self.assertEqual(buffer.flush(), 0)
+        # No row by row retry, every row would wait for the lock again.
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(buffer.depth, 2)
+        self.assertEqual(buffer.flush(), 2)
+
+    def test_rejected_rows_are_dropped(self, _start):
+        buffer = self.make_buffer()
+        rows = [self.log(), self.log(), self.log()]
+        for row in rows:
+            buffer.append(row)
+
+        def save(instances):
+            if len(instances) > 1 or instances[0] is rows[1]:
+                raise IntegrityError
+
+        with mock.patch.object(buffer, "_save", side_effect=save):
+            with self.assertLogs("api.write_behind", "ERROR"):
+                self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(buffer.depth, 0)
+
+    def test_stop_retries_until_the_queue_is_empty(self, _start):
+        buffer = self.make_buffer()
+        buffer.append(self.log())
+        with mock.patch.object(buffer, "_save", side_effect=[OperationalError, None]) as save:
+            with self.assertLogs("api.write_behind", "ERROR"):
+                buffer.stop()
+        self.assertEqual(save.call_count, 2)
+        self.assertEqual(buffer.depth, 0)
+
+    def test_stop_logs_dropped_rows(self, _start):
+        buffer = self.make_buffer()
+        buffer.append(self.log())
+        buffer.append(self.log())
+        with mock.patch.object(buffer, "_save", side_effect=OperationalError):
+            with self.assertLogs("api.write_behind", "ERROR") as logs:
+                buffer.stop()
+        self.assertIn("Write-behind buffer stopped, 2 rows dropped", logs.output[-1])
+        self.assertEqual(buffer.depth, 0)
@@ -1,5 +1,6 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
@@ -14,27 +15,45 @@ schema_view = get_schema_view(
     permission_classes=(permissions.AllowAny,),
 )
 
-urlpatterns = [
+if settings.ASYNC_DEVICE_ENDPOINTS:
+    device_urlpatterns = [
+        path("check_employee_card/", async_views.AsyncCheckEmployeeCardView.as_view()),
+        path("handle_work_time/", async_views.AsyncHandleWorkTimeView.as_view()),
+        path("send_weather_data/", async_views.AsyncSendWeatherDataApiView.as_view()),
+    ]
+else:
+    device_urlpatterns = [
+        path("check_employee_card/", views.CheckEmployeeCardView.as_view()),
+        path("handle_work_time/", views.HandleWorkTimeView.as_view()),
+        path("send_weather_data/", views.SendWeatherDataApiView.as_view()),
+    ]
+
+urlpatterns = device_urlpatterns + [
     path(
         "docs/",
         schema_view.with_ui("swagger", cache_timeout=0),
         name="schema-swagger-ui",
     ),
-    path("check_employee_card/", views.CheckEmployeeCardView.as_view()),
     path("new_employee_card/", views.NewEmployeeCardView.as_view()),
-    path("handle_work_time/", views.HandleWorkTimeView.as_view()),
-    path("send_weather_data/", views.SendWeatherDataApiView.as_view()),
+    path("card_allowlist/", views.CardAllowlistApiView.as_view()),
+    path("send_weather_data/batch/", views.SendWeatherDataBatchApiView.as_view()),
+    path("write_behind/", views.WriteBehindStatusApiView.as_view()),
     path("weather_data/", views.WeatherDataApiView.as_view()),
     path("weather_data/<slug:pk>/", views.WeatherDataDetailApiView.as_view()),
     path("employee_card_log/", views.EmployeeCardLogApiView.as_view()),
+    path("employee_card_log/batch/", views.EmployeeCardLogBatchApiView.as_view()),
     path("employee_card_log/<slug:pk>/", views.EmployeeCartLogDetailApiView.as_view()),
     path("weather_station/", views.WeatherStationApiView.as_view()),
+    path("weather_station/latest/", views.WeatherStationLatestApiView.as_view()),
     path("weather_station/<slug:pk>/", views.WeatherStationDetailApiView.as_view()),
     path("weather_station/<slug:pk>/data/", views.WeatherStationDataApiView.as_view()),
+    path("weather_station/<slug:pk>/aggregate/", views.WeatherStationAggregateApiView.as_view()),
     path("employee/", views.EmployeeApiView.as_view()),
     path("employee/<slug:pk>/", views.EmployeeDetailApiView.as_view()),
     path("employee_card/", views.EmployeeCardApiView.as_view()),
     path("employee_card/<slug:pk>/", views.EmployeeCardDetailApiView.as_view()),
     path("employee_card/<slug:pk>/data", views.EmployeeCardDataApiView.as_view()),
     path("work_space/", views.WorkTimeApiView.as_view()),
+    path("work_space/report/", views.WorkHoursReportApiView.as_view()),
+    path("work_space/occupancy/", views.WorkSpaceOccupancyApiView.as_view()),
 ]
@@ -0,0 +1,18 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def parse_date_param(value):
+    """
+    Parses a YYYY-MM-DD date or an ISO 8601 datetime from a query parameter.
+    Naive values are interpreted in TIME_ZONE. Raises ValueError if the value is invalid.
+    """
+    try:
+        date = timezone.datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        date = parse_datetime(value)
+        if date is None:
+            raise ValueError(f"Invalid date: {value}")
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date, timezone.get_default_timezone())
+    return date
@@ -8,8 +8,97 @@ from django.utils import timezone
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.shortcuts import get_object_or_404
+from django.http import Http404
+from django.db import transaction
+from django.db.models import Prefetch
 from time import sleep
 from .serializers import *
+from . import write_behind
+from .auth_cache import auth_cache
+from .pagination import StartDateCursorPagination
+from .streaming import EXPORT_FORMATS, EXPORT_RENDERERS, iter_weather_data, stream_weather_data
+from rest_framework.settings import api_settings
+from .aggregation import BUCKETS, aggregate_rollups, resolve_bucket
+from .utils import parse_date_param
+from .reports import GROUPS as REPORT_GROUPS, PERIODS as REPORT_PERIODS, work_hours_report
+from .ingest import save_weather_data
+from .downsampling import as_points, downsample_stations, downsample_weather_data
+from . import sharding
+from .archive import as_values, iter_archived
+import heapq
+from .rows import (
+    employee_card_log_rows,
+    employee_card_log_values,
+    weather_data_rows,
+    weather_data_values,
+)
+from .conditional import conditional, version_validators, weather_station_data_validators
+from django.utils.decorators import method_decorator
+from . import response_cache
+from .response_cache import (
+    cache_response,
+    employee_card_data_scopes,
+    employee_card_log_scopes,
+    latest_reading_scopes,
+    model_scopes,
+    weather_data_scopes,
+    weather_station_data_scopes,
+    work_time_scopes,
+)
+from django.conf import settings
+from . import allowlist, work_time
+from .routers import ReplicaReadMixin
+
+
+MAX_POINTS_LIMIT = 10000
+
+max_points_param = openapi.Parameter(
+    "max_points",
+    openapi.IN_QUERY,
+    description="Downsample every station to at most this many readings (LTTB, shared by the three metrics)",
+    type=openapi.TYPE_INTEGER,
+)
+
+
+def get_max_points(request):
+    """
+    Returns the max_points query parameter, None if it is missing.
+    Raises ValueError if it is not an integer between 3 and MAX_POINTS_LIMIT.
+    """
+    max_points = request.query_params.get("max_points", None)
+    if max_points is None:
+        return None
+    max_points = int(max_points)
+    if max_points < 3 or max_points > MAX_POINTS_LIMIT:
+        raise ValueError
+    return max_points
+
+
+def archive_range(request):
+    """
+    Returns the start_date and end_date query parameters as aware datetimes, like the
+    weather data querysets filter them. An invalid or missing value is None.
+    """
+    dates = []
+    for name in ("start_date", "end_date"):
+        try:
+            date = timezone.datetime.strptime(request.query_params[name], "%Y-%m-%d")
+            dates.append(timezone.make_aware(date))
+        except:
+            dates.append(None)
+    return dates
+
+
+def merge_readings(*readings):
+    """Merges values_list() or archived readings of several sources, each newest first."""
+    return heapq.merge(*readings, key=lambda row: row[5], reverse=True)
+
+
+def max_points_error():
+    return Response(
+        {"status": f"ERROR - max_points must be an integer between 3 and {MAX_POINTS_LIMIT}"},
+        status=status.HTTP_400_BAD_REQUEST,
+    )
 
 
 class CheckEmployeeCardView(APIView):
@@ -51,6 +140,14 @@ class CheckEmployeeCardView(APIView):
                     }
                 },
             ),
+            503: openapi.Response(
+                description="Service Unavailable - write-behind queue is full, retry later",
+                examples={
+                    "application/json": {
+                        "status": "ERROR - server busy, retry later",
+                    }
+                },
+            ),
         },
     )
     def post(self, request):
@@ -59,32 +156,87 @@ class CheckEmployeeCardView(APIView):
         except:
             print("ERROR - missing card_number parameter")
             return Response({"status": "ERROR"}, status=status.HTTP_400_BAD_REQUEST)
-        weather_station = None
+        weather_station_id = None
         if "weather_station" in request.data:
-            weather_station = request.data["weather_station"]
-            try:
-                weather_station = get_object_or_404(
-                    WeatherStation, id=weather_station, is_active=True
-                )
-                print(weather_station)
-            except:
+            weather_station_id = request.data["weather_station"]
+            if not auth_cache.is_active_station(weather_station_id):
                 return Response(
                     {"status": "ERROR"}, status=status.HTTP_401_UNAUTHORIZED
                 )
-        employee_card = get_object_or_404(
-            EmployeeCard, card_number=card_number
-        )
+        employee_card = auth_cache.get_card(card_number)
+        if employee_card is None:
+            raise Http404
         if employee_card.is_active:
             employee_card_log = EmployeeCardLog(
-                employee_card=employee_card,
+                employee_card_id=employee_card.id,
                 date=timezone.now(),
-                weather_station=weather_station,
+                weather_station_id=weather_station_id,
             )
-            employee_card_log.save()
+            if write_behind.is_enabled():
+                if not write_behind.buffer.append(employee_card_log):
+                    return Response(write_behind.BUSY, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            else:
+                employee_card_log.save()
             return Response({"status": "OK"}, status=status.HTTP_200_OK)
         else:
             return Response({"status": "ERROR - card is inactive"}, status=status.HTTP_403_FORBIDDEN)
 
+class CardAllowlistApiView(APIView):
+    """
+    Returns the versioned allowlist of card numbers for offline card readers.
+    Without since the full list is returned, otherwise only the changes after that version.
+    A version the server cannot answer for, too old or newer than the current one, gets
+    the full list too.
+    """
+
+    since_param = openapi.Parameter(
+        "since",
+        openapi.IN_QUERY,
+        description="Allowlist version the reader already has",
+        type=openapi.TYPE_INTEGER,
+    )
+
+    @swagger_auto_schema(
+        manual_parameters=[since_param],
+        responses={
+            200: openapi.Response(
+                description="OK - full allowlist or changes since the given version",
+                examples={
+                    "application/json": {
+                        "version": 42,
+                        "full": False,
+                        "added": ["4046804185457499"],
+                        "removed": ["4532015112830366"],
+                    }
+                },
+            ),
+        },
+    )
+    def get(self, request):
+        version = allowlist.current_version()
+        delta = None
+        since = request.query_params.get("since", None)
+        if since is not None:
+            try:
+                delta = allowlist.get_delta(int(since))
+            except ValueError:
+                pass
+        if delta is None:
+            return Response(
+                {
+                    "version": version,
+                    "full": True,
+                    "cards": sorted(allowlist.allowed_card_numbers()),
+                },
+                status=status.HTTP_200_OK,
+            )
+        added, removed = delta
+        return Response(
+            {"version": version, "full": False, "added": added, "removed": removed},
+            status=status.HTTP_200_OK,
+        )
+
+
 class NewEmployeeCardView(APIView):
     """Checks if the card is active, otherwise creates a new one."""
 
@@ -203,6 +355,14 @@ class HandleWorkTimeView(APIView):
                     }
                 },
             ),
+            404: openapi.Response(
+                description="Not Found - card does not exist or has no employee",
+                examples={
+                    "application/json": {
+                        "status": "ERROR",
+                    }
+                },
+            ),
         },
     )
     def post(self, request):
@@ -222,28 +382,12 @@ class HandleWorkTimeView(APIView):
         employee_card = get_object_or_404(
             EmployeeCard, card_number=card_number
         )
-        if employee_card.is_active:
-            if WorkTime.objects.filter(employee=employee_card.employee, end_date=None).exists():
-                work_time = WorkTime.objects.get(employee=employee_card.employee, end_date=None)
-                if work_time.work_space.end_station != weather_station:
-                    return Response({"status": "ERROR - Can't end WorkTime at this station!"}, status=status.HTTP_401_UNAUTHORIZED)
-                else:
-                    work_time.end_date = timezone.now()
-                    work_time.end_station = weather_station
-                    work_time.save()
-                    return Response({"status": "OK - WorkTime ended"}, status=status.HTTP_200_OK)
-            else:
-                try:
-                    work_space = WorkSpace.objects.filter(start_station=weather_station).first()
-                    if work_space is None:
-                        return Response({"status": "ERROR - Can't start WorkTime at this station!"}, status=status.HTTP_401_UNAUTHORIZED)
-                except:
-                    return Response({"status": "ERROR - Invalid work_station id"}, status=status.HTTP_401_UNAUTHORIZED)
-                work_time = WorkTime(employee=employee_card.employee, start_date=timezone.now(), start_station=weather_station, work_space=work_space)
-                work_time.save()
-                return Response({"status": "OK - WorkTime started"}, status=status.HTTP_200_OK)
-        else:
+        if not employee_card.is_active:
             return Response({"status": "ERROR - Employee card is inactive!"}, status=status.HTTP_401_UNAUTHORIZED)
+        if employee_card.employee_id is None:
+            return Response({"status": "ERROR - Employee card has no employee!"}, status=status.HTTP_404_NOT_FOUND)
+        message, code = work_time.handle_swipe(employee_card.employee_id, weather_station)
+        return Response({"status": message}, status=code)
 
 
 class SendWeatherDataApiView(APIView):
@@ -280,12 +424,26 @@ class SendWeatherDataApiView(APIView):
                     }
                 },
             ),
+            503: openapi.Response(
+                description="Service Unavailable - write-behind queue is full, retry later",
+                examples={
+                    "application/json": {
+                        "status": "ERROR - server busy, retry later",
+                    }
+                },
+            ),
         },
     )
     def post(self, request):
         serializer = WeatherDataAddSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            if write_behind.is_enabled():
+                if not write_behind.buffer.append(
+                    WeatherData(date=timezone.now(), **serializer.validated_data)
+                ):
+                    return Response(write_behind.BUSY, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            else:
+                serializer.save()
             return Response({"status": "OK"}, status=status.HTTP_200_OK)
         else:
             return Response(
@@ -294,13 +452,181 @@ class SendWeatherDataApiView(APIView):
             )
 
 
-class WeatherDataApiView(ListAPIView):
+class SendWeatherDataBatchApiView(APIView):
+    """Saves a batch of weather data readings in a single transaction."""
+
+    max_batch_size = 1000
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=["readings"],
+            properties={
+                "readings": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        required=[
+                            "weather_station",
+                            "temperature",
+                            "humidity",
+                            "pressure",
+                            "date",
+                        ],
+                        properties={
+                            "weather_station": openapi.Schema(
+                                type=openapi.TYPE_STRING,
+                                description="Weather station ID",
+                            ),
+                            "temperature": openapi.Schema(type=openapi.TYPE_NUMBER),
+                            "humidity": openapi.Schema(type=openapi.TYPE_NUMBER),
+                            "pressure": openapi.Schema(type=openapi.TYPE_NUMBER),
+                            "date": openapi.Schema(
+                                type=openapi.TYPE_STRING,
+                                format=openapi.FORMAT_DATETIME,
+                            ),
+                        },
+                    ),
+                ),
+            },
+        ),
+        responses={
+            200: openapi.Response(
+                description="OK - valid readings saved, invalid ones reported",
+                examples={
+                    "application/json": {
+                        "status": "OK",
+                        "saved": 29,
+                        "rejected": [
+                            {
+                                "index": 3,
+                                "errors": {
+                                    "humidity": ["Humidity must be between 0 and 100"]
+                                },
+                            }
+                        ],
+                    }
+                },
+            ),
+            400: openapi.Response(
+                description="Bad Request - no readings or every reading is invalid",
+                examples={
+                    "application/json": {
+                        "status": "ERROR",
+                        "saved": 0,
+                        "rejected": [
+                            {
+                                "index": 0,
+                                "errors": {"date": ["This field is required."]},
+                            }
+                        ],
+                    }
+                },
+            ),
+        },
+    )
+    def post(self, request):
+        readings = None
+        if isinstance(request.data, dict):
+            readings = request.data.get("readings", None)
+        if not isinstance(readings, list) or len(readings) == 0:
+            return Response(
+                {"status": "ERROR - Provide a non-empty readings list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(readings) > self.max_batch_size:
+            return Response(
+                {"status": f"ERROR - At most {self.max_batch_size} readings per batch"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        valid = []
+        rejected = []
+        for index, reading in enumerate(readings):
+            serializer = WeatherDataBatchItemSerializer(data=reading)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                rejected.append({"index": index, "errors": serializer.errors})
+        station_ids = {data["weather_station"] for _, data in valid}
+        known_stations = set(
+            WeatherStation.objects.filter(id__in=station_ids).values_list("id", flat=True)
+        )
+        weather_data = []
+        for index, data in valid:
+            if data["weather_station"] not in known_stations:
+                rejected.append(
+                    {
+                        "index": index,
+                        "errors": {
+                            "weather_station": [
+                                f'Invalid pk "{data["weather_station"]}" - object does not exist.'
+                            ]
+                        },
+                    }
+                )
+                continue
+            weather_data.append(
+                WeatherData(
+                    weather_station_id=data["weather_station"],
+                    temperature=data["temperature"],
+                    humidity=data["humidity"],
+                    pressure=data["pressure"],
+                    date=data["date"],
+                )
+            )
+        rejected.sort(key=lambda row: row["index"])
+        if not weather_data:
+            return Response(
+                {"status": "ERROR", "saved": 0, "rejected": rejected},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        save_weather_data(weather_data)
+        return Response(
+            {"status": "OK", "saved": len(weather_data), "rejected": rejected},
+            status=status.HTTP_200_OK,
+        )
+
+
+class WriteBehindStatusApiView(APIView):
+    """Reports the state of the write-behind buffer."""
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response(
+                description="OK - write-behind buffer state",
+                examples={
+                    "application/json": {
+                        "enabled": True,
+                        "depth": 12,
+                        "flush_interval_ms": 250,
+                        "max_rows": 500,
+                        "max_pending": 10000,
+                    }
+                },
+            ),
+        },
+    )
+    def get(self, request):
+        return Response(
+            {
+                "enabled": write_behind.is_enabled(),
+                "depth": write_behind.buffer.depth,
+                "flush_interval_ms": int(write_behind.buffer.flush_interval * 1000),
+                "max_rows": write_behind.buffer.max_rows,
+                "max_pending": write_behind.buffer.max_pending,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class WeatherDataApiView(ReplicaReadMixin, ListAPIView):
     """
     Retrieves a list of weather data records.
     Supports filtering by weather station ID, start date, and end date.
     """
 
     serializer_class = WeatherDataSerializer
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + EXPORT_RENDERERS
     weather_station_param = openapi.Parameter(
         "weather_station",
         openapi.IN_QUERY,
@@ -319,6 +645,13 @@ class WeatherDataApiView(ListAPIView):
         description="End date for filtering data (YYYY-MM-DD)",
         type=openapi.TYPE_STRING,
     )
+    format_param = openapi.Parameter(
+        "format",
+        openapi.IN_QUERY,
+        description="Stream the whole range as ndjson or csv instead of a JSON page",
+        type=openapi.TYPE_STRING,
+        enum=list(EXPORT_FORMATS),
+    )
     response_schema_dict = {
         200: openapi.Response(
             description="List of weather data records",
@@ -327,23 +660,104 @@ class WeatherDataApiView(ListAPIView):
     }
 
     @swagger_auto_schema(
-        manual_parameters=[weather_station_param, start_date_param, end_date_param],
+        manual_parameters=[
+            weather_station_param,
+            start_date_param,
+            end_date_param,
+            format_param,
+            max_points_param,
+        ],
         responses=response_schema_dict,
     )
+    @method_decorator(cache_response(weather_data_scopes, history_param="end_date"))
     def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+        if request.accepted_renderer.format in EXPORT_FORMATS:
+            return stream_weather_data(
+                merge_readings(
+                    *(iter_weather_data(queryset) for queryset in self.get_shard_querysets()),
+                    self.iter_archived(),
+                ),
+                request.accepted_renderer.format,
+                "weather_data",
+            )
+        try:
+            max_points = get_max_points(request)
+        except ValueError:
+            return max_points_error()
+        if max_points is not None:
+            return Response(
+                {
+                    "next": None,
+                    "previous": None,
+                    "results": self.downsample(max_points),
+                },
+                status=status.HTTP_200_OK,
+            )
+        page = self.paginate_queryset(weather_data_values(self.get_queryset()))
+        return self.get_paginated_response(weather_data_rows(page))
+
+    def downsample(self, max_points):
+        """Downsamples every shard in parallel, a station's series is always in one shard."""
+        archived = self.iter_archived(descending=False)
+        shards = self.get_shards()
+        if len(shards) == 1:
+            return downsample_weather_data(self.get_queryset(), max_points, archived=archived)
+        archived_by_shard = {}
+        for row in archived:
+            archived_by_shard.setdefault(sharding.shard_for(row[1]), []).append(row)
+        queryset = self.get_queryset()
+        rows = sharding.run_on_shards(
+            lambda alias: downsample_stations(
+                queryset.using(alias), max_points, archived=archived_by_shard.get(alias, ())
+            ),
+            shards,
+        )
+        return as_points(row for shard_rows in rows for row in shard_rows)
+
+    def get_weather_station(self):
+        try:
+            return uuid.UUID(self.request.query_params["weather_station"])
+        except:
+            return None
+
+    def get_shards(self):
+        """Shards DateCursorPagination reads the page from, see sharding.py."""
+        weather_station = self.get_weather_station()
+        if weather_station is not None:
+            return [sharding.shard_for(weather_station)]
+        return sharding.shard_aliases()
+
+    def get_shard_querysets(self):
+        queryset = self.get_queryset()
+        shards = self.get_shards()
+        if len(shards) == 1:
+            return [queryset]
+        return [queryset.using(alias) for alias in shards]
+
+    def iter_archived(self, descending=True, after=None, start=None, end=None):
+        """Archived readings matching the query parameters, see archive.iter_archived."""
+        weather_station = self.get_weather_station()
+        start_date, end_date = archive_range(self.request)
+        if start is not None:
+            start_date = max(start_date, start) if start_date is not None else start
+        if end is not None:
+            end_date = min(end_date, end) if end_date is not None else end
+        return iter_archived(weather_station, start_date, end_date, descending, after)
+
+    def get_archived_rows(self, descending, after, bound):
+        """Archived rows for DateCursorPagination, nothing past bound can reach the page."""
+        if descending:
+            return as_values(self.iter_archived(descending, after, start=bound))
+        return as_values(self.iter_archived(descending, after, end=bound))
 
     def get_queryset(self):
         queryset = WeatherData.objects.all().order_by("-date")
-        weather_station = self.request.query_params.get("weather_station", None)
+        weather_station = self.get_weather_station()
         start_date = self.request.query_params.get("start_date", None)
         end_date = self.request.query_params.get("end_date", None)
         if weather_station is not None:
-            try:
-                weather_station = uuid.UUID(weather_station)
-                queryset = queryset.filter(weather_station=weather_station)
-            except:
-                pass
+            queryset = sharding.weather_data(weather_station).order_by("-date")
+            queryset = queryset.filter(weather_station=weather_station)
         if start_date is not None:
             try:
                 start_date = timezone.datetime.strptime(start_date, "%Y-%m-%d")
@@ -385,14 +799,16 @@ class WeatherDataDetailApiView(APIView):
     )
     def get(self, request, pk):
         try:
-            weather_data = get_object_or_404(WeatherData, id=pk)
+            weather_data = sharding.find_weather_data(pk)
         except:
+            weather_data = None
+        if weather_data is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
         serializer = WeatherDataSerializer(weather_data)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class EmployeeCardLogApiView(ListAPIView):
+class EmployeeCardLogApiView(ReplicaReadMixin, ListAPIView):
     """
     Retrieves a list of employee card logs.
     Supports filtering by weather station ID, employee ID, start date, and end date.
@@ -439,8 +855,10 @@ class EmployeeCardLogApiView(ListAPIView):
         ],
         responses=response_schema_dict,
     )
+    @method_decorator(cache_response(employee_card_log_scopes, history_param="end_date"))
     def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+        page = self.paginate_queryset(employee_card_log_values(self.get_queryset()))
+        return self.get_paginated_response(employee_card_log_rows(page))
 
     def get_queryset(self):
         queryset = EmployeeCardLog.objects.all().order_by("-date")
@@ -474,6 +892,126 @@ class EmployeeCardLogApiView(ListAPIView):
         return queryset
 
 
+class EmployeeCardLogBatchApiView(APIView):
+    """Saves a batch of card swipes recorded by an offline card reader."""
+
+    max_batch_size = 1000
+
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=["swipes"],
+            properties={
+                "swipes": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        required=["card_number", "date"],
+                        properties={
+                            "card_number": openapi.Schema(type=openapi.TYPE_STRING),
+                            "weather_station": openapi.Schema(
+                                type=openapi.TYPE_STRING,
+                                description="Weather station ID",
+                            ),
+                            "date": openapi.Schema(
+                                type=openapi.TYPE_STRING,
+                                format=openapi.FORMAT_DATETIME,
+                            ),
+                        },
+                    ),
+                ),
+            },
+        ),
+        responses={
+            200: openapi.Response(
+                description="OK - valid swipes saved, invalid ones reported",
+                examples={
+                    "application/json": {
+                        "status": "OK",
+                        "saved": 29,
+                        "rejected": [
+                            {
+                                "index": 3,
+                                "errors": {"card_number": ["Card is inactive."]},
+                            }
+                        ],
+                    }
+                },
+            ),
+            400: openapi.Response(
+                description="Bad Request - no swipes or every swipe is invalid",
+            ),
+        },
+    )
+    def post(self, request):
+        swipes = None
+        if isinstance(request.data, dict):
+            swipes = request.data.get("swipes", None)
+        if not isinstance(swipes, list) or len(swipes) == 0:
+            return Response(
+                {"status": "ERROR - Provide a non-empty swipes list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(swipes) > self.max_batch_size:
+            return Response(
+                {"status": f"ERROR - At most {self.max_batch_size} swipes per batch"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        valid = []
+        rejected = []
+        for index, swipe in enumerate(swipes):
+            serializer = EmployeeCardLogBatchItemSerializer(data=swipe)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                rejected.append({"index": index, "errors": serializer.errors})
+        cards = {
+            card_number: (card_id, is_active)
+            for card_number, card_id, is_active in EmployeeCard.objects.filter(
+                card_number__in={data["card_number"] for _, data in valid}
+            ).values_list("card_number", "id", "is_active")
+        }
+        active_stations = set(
+            WeatherStation.objects.filter(
+                id__in={data.get("weather_station") for _, data in valid},
+                is_active=True,
+            ).values_list("id", flat=True)
+        )
+        employee_card_logs = []
+        for index, data in valid:
+            station_id = data.get("weather_station", None)
+            card = cards.get(data["card_number"], None)
+            if card is None:
+                errors = {"card_number": ["Card does not exist."]}
+            elif not card[1]:
+                errors = {"card_number": ["Card is inactive."]}
+            elif station_id is not None and station_id not in active_stations:
+                errors = {"weather_station": ["Weather station does not exist or is inactive."]}
+            else:
+                employee_card_logs.append(
+                    EmployeeCardLog(
+                        employee_card_id=card[0],
+                        weather_station_id=station_id,
+                        date=data["date"],
+                    )
+                )
+                continue
+            rejected.append({"index": index, "errors": errors})
+        rejected.sort(key=lambda row: row["index"])
+        if not employee_card_logs:
+            return Response(
+                {"status": "ERROR", "saved": 0, "rejected": rejected},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        with transaction.atomic():
+            EmployeeCardLog.objects.bulk_create(employee_card_logs)
+            response_cache.invalidate(EmployeeCardLog, employee_card_logs)
+        return Response(
+            {"status": "OK", "saved": len(employee_card_logs), "rejected": rejected},
+            status=status.HTTP_200_OK,
+        )
+
+
 class EmployeeCartLogDetailApiView(APIView):
     @swagger_auto_schema(
         responses={
@@ -528,12 +1066,54 @@ class WeatherStationApiView(APIView):
             ),
         },
     )
+    @method_decorator(conditional(version_validators("weatherstation")))
+    @method_decorator(cache_response(model_scopes("weatherstation")))
     def get(self, request):
         weather_station = WeatherStation.objects.all()
         serializer = WeatherStationSerializer(weather_station, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class WeatherStationLatestApiView(APIView):
+    """Retrieves every weather station together with its latest reading."""
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response(
+                description="OK - weather stations with their latest reading",
+                schema=WeatherStationLatestSerializer(many=True),
+                examples={
+                    "application/json": [
+                        {
+                            "id": "4d438238-ff5b-4577-91c6-ffa2cb953057",
+                            "name": "Weather station 1",
+                            "is_active": True,
+                            "latest_reading": {
+                                "id": "5e5b29c6-80ea-4410-b027-861c3a55134b",
+                                "temperature": 23,
+                                "humidity": 43,
+                                "pressure": 1000,
+                                "date": "2024-01-18T11:56:58.844777Z",
+                            },
+                        },
+                        {
+                            "id": "4d438238-ff5b-4577-91c6-ffa2cb953057",
+                            "name": "Weather station 2",
+                            "is_active": True,
+                            "latest_reading": None,
+                        },
+                    ]
+                },
+            ),
+        },
+    )
+    @method_decorator(cache_response(latest_reading_scopes))
+    def get(self, request):
+        weather_station = WeatherStation.objects.select_related("latest_reading")
+        serializer = WeatherStationLatestSerializer(weather_station, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
 class WeatherStationDetailApiView(APIView):
     """Retrieves a single weather station."""
 
@@ -555,6 +1135,7 @@ class WeatherStationDetailApiView(APIView):
             ),
         },
     )
+    @method_decorator(conditional(version_validators("weatherstation")))
     def get(self, request, pk):
         try:
             weather_station = get_object_or_404(WeatherStation, id=pk)
@@ -593,6 +1174,8 @@ class EmployeeApiView(APIView):
             ),
         },
     )
+    @method_decorator(conditional(version_validators("employee")))
+    @method_decorator(cache_response(model_scopes("employee")))
     def get(self, request):
         employee = Employee.objects.all()
         serializer = EmployeeSerializer(employee, many=True)
@@ -622,6 +1205,7 @@ class EmployeeDetailApiView(APIView):
             ),
         },
     )
+    @method_decorator(conditional(version_validators("employee")))
     def get(self, request, pk):
         try:
             employee = get_object_or_404(Employee, id=pk)
@@ -658,6 +1242,8 @@ class EmployeeCardApiView(APIView):
             ),
         },
     )
+    @method_decorator(conditional(version_validators("employeecard")))
+    @method_decorator(cache_response(model_scopes("employeecard")))
     def get(self, request):
         employee_card = EmployeeCard.objects.all()
         serializer = EmployeeCardSerializer(employee_card, many=True)
@@ -686,6 +1272,7 @@ class EmployeeCardDetailApiView(APIView):
             ),
         },
     )
+    @method_decorator(conditional(version_validators("employeecard")))
     def get(self, request, pk):
         try:
             employee_card = get_object_or_404(EmployeeCard, id=pk)
@@ -695,13 +1282,14 @@ class EmployeeCardDetailApiView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class WeatherStationDataApiView(ListAPIView):
+class WeatherStationDataApiView(ReplicaReadMixin, ListAPIView):
     """
     Retrieves a list of weather data records for a given weather station.
     Supports filtering by start date and end date.
     """
 
     serializer_class = WeatherStationDataSerializer
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + EXPORT_RENDERERS
 
     start_date_param = openapi.Parameter(
         "start_date",
@@ -734,29 +1322,65 @@ class WeatherStationDataApiView(ListAPIView):
         ),
     }
 
+    format_param = openapi.Parameter(
+        "format",
+        openapi.IN_QUERY,
+        description="Stream the readings as ndjson or csv instead of JSON",
+        type=openapi.TYPE_STRING,
+        enum=list(EXPORT_FORMATS),
+    )
+
     @swagger_auto_schema(
-        manual_parameters=[start_date_param, end_date_param],
+        manual_parameters=[start_date_param, end_date_param, format_param, max_points_param],
         responses=responses_schema_dict,
     )
+    @method_decorator(conditional(weather_station_data_validators))
+    @method_decorator(cache_response(weather_station_data_scopes, history_param="end_date"))
     def get(self, request, pk):
         try:
             weather_station = get_object_or_404(WeatherStation, id=pk)
         except:
             return Response(status=status.HTTP_404_NOT_FOUND)
         weather_data = self.get_queryset().filter(weather_station=weather_station)
-        data = {
-            "station_name": str(weather_station.name),
-            "station_id": str(weather_station.id),
-            "weather_data": WeatherDataSerializer(weather_data, many=True).data,
-        }
-        serializer = WeatherStationDataSerializer(data=data)
-        if serializer.is_valid():
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        if sharding.is_sharded():
+            weather_data = weather_data.using(sharding.shard_for(weather_station.id))
+        start_date, end_date = archive_range(request)
+        if request.accepted_renderer.format in EXPORT_FORMATS:
+            return stream_weather_data(
+                merge_readings(
+                    iter_weather_data(weather_data),
+                    iter_archived(weather_station.id, start_date, end_date),
+                ),
+                request.accepted_renderer.format,
+                f"weather_station_{weather_station.id}",
+            )
+        try:
+            max_points = get_max_points(request)
+        except ValueError:
+            return max_points_error()
+        if max_points is not None:
+            weather_data = downsample_weather_data(
+                weather_data,
+                max_points,
+                archived=iter_archived(weather_station.id, start_date, end_date, descending=False),
+            )
         else:
-            return Response(
-                {"status": "ERROR", "errors": serializer.errors},
-                status=status.HTTP_400_BAD_REQUEST,
+            weather_data = weather_data_rows(
+                heapq.merge(
+                    weather_data_values(weather_data),
+                    as_values(iter_archived(weather_station.id, start_date, end_date)),
+                    key=lambda row: row["date"],
+                    reverse=True,
+                )
             )
+        return Response(
+            {
+                "station_name": str(weather_station.name),
+                "station_id": str(weather_station.id),
+                "weather_data": weather_data,
+            },
+            status=status.HTTP_200_OK,
+        )
 
     def get_queryset(self):
         queryset = WeatherData.objects.all().order_by("-date")
@@ -777,7 +1401,100 @@ class WeatherStationDataApiView(ListAPIView):
         return queryset
 
 
-class EmployeeCardDataApiView(ListAPIView):
+class WeatherStationAggregateApiView(APIView):
+    """
+    Returns count and min/max/avg of temperature, humidity and pressure of a weather
+    station per time bucket. Buckets are aligned to TIME_ZONE, read from the rollup tables
+    and always cover whole buckets, so they still answer for ranges whose raw readings the
+    retention policy removed.
+    """
+
+    bucket_param = openapi.Parameter(
+        "bucket",
+        openapi.IN_QUERY,
+        description="Bucket size: minute (1m), hour (1h), day (1d), week (1w) or month (1mo)",
+        type=openapi.TYPE_STRING,
+        default="hour",
+    )
+    start_param = openapi.Parameter(
+        "start",
+        openapi.IN_QUERY,
+        description="Start of the range (YYYY-MM-DD or ISO 8601 datetime)",
+        type=openapi.TYPE_STRING,
+    )
+    end_param = openapi.Parameter(
+        "end",
+        openapi.IN_QUERY,
+        description="End of the range (YYYY-MM-DD or ISO 8601 datetime)",
+        type=openapi.TYPE_STRING,
+    )
+
+    @swagger_auto_schema(
+        manual_parameters=[bucket_param, start_param, end_param],
+        responses={
+            200: openapi.Response(
+                description="OK - aggregated weather data",
+                examples={
+                    "application/json": {
+                        "station_name": "Weather station 1",
+                        "station_id": "4d438238-ff5b-4577-91c6-ffa2cb953057",
+                        "bucket": "hour",
+                        "time_zone": "UTC",
+                        "buckets": [
+                            {
+                                "bucket": "2024-01-18T11:00:00Z",
+                                "count": 30,
+                                "temperature": {"min": 21.5, "max": 23.0, "avg": 22.1},
+                                "humidity": {"min": 40.0, "max": 43.0, "avg": 41.7},
+                                "pressure": {"min": 998.0, "max": 1001.0, "avg": 999.4},
+                            }
+                        ],
+                    }
+                },
+            ),
+            400: openapi.Response(
+                description="Bad Request - unknown bucket or invalid date",
+            ),
+            404: openapi.Response(
+                description="Not Found - weather station does not exist",
+            ),
+        },
+    )
+    @method_decorator(cache_response(weather_station_data_scopes))
+    def get(self, request, pk):
+        try:
+            weather_station = get_object_or_404(WeatherStation, id=pk)
+        except:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        bucket = resolve_bucket(request.query_params.get("bucket", "hour"))
+        if bucket is None:
+            return Response(
+                {"status": "ERROR - bucket must be one of: " + ", ".join(BUCKETS)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        start = request.query_params.get("start", None)
+        end = request.query_params.get("end", None)
+        try:
+            start = parse_date_param(start) if start is not None else None
+            end = parse_date_param(end) if end is not None else None
+        except ValueError as error:
+            return Response(
+                {"status": f"ERROR - {error}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        buckets = aggregate_rollups(weather_station, bucket, start, end)
+        return Response(
+            {
+                "station_name": str(weather_station.name),
+                "station_id": str(weather_station.id),
+                "bucket": bucket,
+                "time_zone": settings.TIME_ZONE,
+                "buckets": buckets,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class EmployeeCardDataApiView(ReplicaReadMixin, ListAPIView):
     """
     Retrieves a list of employee card logs for a given employee card.
     Supports filtering by start date and end date.
@@ -820,26 +1537,25 @@ class EmployeeCardDataApiView(ListAPIView):
         manual_parameters=[start_date_param, end_date_param],
         responses=responses_schema_dict,
     )
+    @method_decorator(cache_response(employee_card_data_scopes, history_param="end_date"))
     def get(self, request, pk):
         try:
-            employee_card = get_object_or_404(EmployeeCard, id=pk)
+            employee_card = get_object_or_404(EmployeeCard.objects.select_related("employee"), id=pk)
         except:
             return Response(status=status.HTTP_404_NOT_FOUND)
         employee_card_log = self.get_queryset()
         employee_card_log = employee_card_log.filter(employee_card=employee_card)
-        data = {
-            "card_number": str(employee_card.card_number),
-            "employee": EmployeeSerializer(employee_card.employee).data,
-            "card_logs": EmployeeCardLogSerializer(employee_card_log, many=True).data,
-        }
-        serializer = EmployeeCardDataSerializer(data=data)
-        if serializer.is_valid():
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        else:
-            return Response(
-                {"status": "ERROR", "errors": serializer.errors},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        employee = None
+        if employee_card.employee is not None:
+            employee = EmployeeSerializer(employee_card.employee).data
+        return Response(
+            {
+                "card_number": str(employee_card.card_number),
+                "employee": employee,
+                "card_logs": employee_card_log_rows(employee_card_log_values(employee_card_log)),
+            },
+            status=status.HTTP_200_OK,
+        )
 
     def get_queryset(self):
         queryset = EmployeeCardLog.objects.all().order_by("-date")
@@ -860,9 +1576,10 @@ class EmployeeCardDataApiView(ListAPIView):
         return queryset
 
 
-class WorkTimeApiView(APIView):
+class WorkTimeApiView(ReplicaReadMixin, APIView):
     
     serializer_class = WorkTimeSerializer
+    pagination_class = StartDateCursorPagination
     response_schema_dict = {
         200: openapi.Response(
             description="List of work times",
@@ -893,19 +1610,46 @@ class WorkTimeApiView(APIView):
         description="ID of the work space",
         type=openapi.TYPE_STRING,
     )
+    cursor_param = openapi.Parameter(
+        "cursor",
+        openapi.IN_QUERY,
+        description="The pagination cursor value",
+        type=openapi.TYPE_STRING,
+    )
+    page_size_param = openapi.Parameter(
+        "page_size",
+        openapi.IN_QUERY,
+        description="Number of results to return per page",
+        type=openapi.TYPE_INTEGER,
+    )
     
     @swagger_auto_schema(
-        manual_parameters=[start_date_param, end_date_param, employee_param, work_space_param],
+        manual_parameters=[
+            start_date_param,
+            end_date_param,
+            employee_param,
+            work_space_param,
+            cursor_param,
+            page_size_param,
+        ],
         responses=response_schema_dict,
     )
+    @method_decorator(cache_response(work_time_scopes))
     def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = WorkTimeSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(self.get_queryset(), request, view=self)
+        serializer = WorkTimeSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     
     def get_queryset(self):
-        queryset = WorkTime.objects.all().order_by("-start_date")
+        queryset = WorkTime.objects.select_related(
+            "employee",
+            "work_space__start_station",
+            "work_space__end_station",
+            "start_station",
+            "end_station",
+        ).order_by("-start_date")
         if self.request.query_params.get("employee", None) is not None:
             queryset = queryset.filter(employee=self.request.query_params.get("employee", None))
         if self.request.query_params.get("work_space", None) is not None:
@@ -915,4 +1659,190 @@ class WorkTimeApiView(APIView):
         if self.request.query_params.get("end_date", None) is not None:
             queryset = queryset.filter(end_date__lte=self.request.query_params.get("end_date", None))
         return queryset    
-    
\ No newline at end of file
+    
+
+class WorkHoursReportApiView(APIView):
+    """
+    Returns the worked hours between start_date and end_date grouped by employee and/or
+    work space, in total or per day. Shifts are clamped to the range and open shifts are
+    counted up to end_date (or now, if that is earlier). Computed with a single query.
+    """
+
+    start_date_param = openapi.Parameter(
+        "start_date",
+        openapi.IN_QUERY,
+        description="Start of the report (YYYY-MM-DD or ISO 8601 datetime)",
+        type=openapi.TYPE_STRING,
+        required=True,
+    )
+    end_date_param = openapi.Parameter(
+        "end_date",
+        openapi.IN_QUERY,
+        description="End of the report, exclusive (YYYY-MM-DD or ISO 8601 datetime)",
+        type=openapi.TYPE_STRING,
+        required=True,
+    )
+    group_by_param = openapi.Parameter(
+        "group_by",
+        openapi.IN_QUERY,
+        description="Comma separated: employee, work_space or both",
+        type=openapi.TYPE_STRING,
+        default="employee",
+    )
+    period_param = openapi.Parameter(
+        "period",
+        openapi.IN_QUERY,
+        description="total, or day for a breakdown by the day the shift started on (TIME_ZONE)",
+        type=openapi.TYPE_STRING,
+        enum=list(REPORT_PERIODS),
+        default="total",
+    )
+    employee_param = openapi.Parameter(
+        "employee",
+        openapi.IN_QUERY,
+        description="ID of the employee",
+        type=openapi.TYPE_STRING,
+    )
+    work_space_param = openapi.Parameter(
+        "work_space",
+        openapi.IN_QUERY,
+        description="ID of the work space",
+        type=openapi.TYPE_STRING,
+    )
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            start_date_param,
+            end_date_param,
+            group_by_param,
+            period_param,
+            employee_param,
+            work_space_param,
+        ],
+        responses={
+            200: openapi.Response(
+                description="OK - worked hours",
+                examples={
+                    "application/json": {
+                        "start_date": "2024-01-01T00:00:00Z",
+                        "end_date": "2024-02-01T00:00:00Z",
+                        "group_by": ["employee"],
+                        "period": "total",
+                        "results": [
+                            {
+                                "employee": {
+                                    "id": "b53a217f-0638-4ce8-ad41-5b824aedafb5",
+                                    "name": "Jan",
+                                    "surname": "Kowalski",
+                                },
+                                "hours": 160.25,
+                                "shifts": 21,
+                                "open_shifts": 0,
+                            }
+                        ],
+                    }
+                },
+            ),
+            400: openapi.Response(
+                description="Bad Request - missing or invalid parameter",
+            ),
+        },
+    )
+    @method_decorator(cache_response(model_scopes("worktime", "employee", "workspace")))
+    def get(self, request):
+        try:
+            start = parse_date_param(request.query_params["start_date"])
+            end = parse_date_param(request.query_params["end_date"])
+        except KeyError:
+            return Response(
+                {"status": "ERROR - Provide start_date and end_date"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except ValueError as error:
+            return Response({"status": f"ERROR - {error}"}, status=status.HTTP_400_BAD_REQUEST)
+        if end <= start:
+            return Response(
+                {"status": "ERROR - end_date must be after start_date"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        group_by = request.query_params.get("group_by", "employee").split(",")
+        if not group_by or any(group not in REPORT_GROUPS for group in group_by):
+            return Response(
+                {"status": "ERROR - group_by must be employee, work_space or both"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        group_by = [group for group in REPORT_GROUPS if group in group_by]
+        period = request.query_params.get("period", "total")
+        if period not in REPORT_PERIODS:
+            return Response(
+                {"status": "ERROR - period must be one of: " + ", ".join(REPORT_PERIODS)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        filters = {}
+        for param in ("employee", "work_space"):
+            if request.query_params.get(param, None) is not None:
+                try:
+                    filters[param] = uuid.UUID(request.query_params[param])
+                except ValueError:
+                    return Response(
+                        {"status": f"ERROR - Invalid {param} id"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+        return Response(
+            {
+                "start_date": start,
+                "end_date": end,
+                "group_by": group_by,
+                "period": period,
+                "results": work_hours_report(start, end, group_by, period, **filters),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class WorkSpaceOccupancyApiView(APIView):
+    """
+    Returns every work space with the employees currently working in it.
+    Read from the WorkSpacePresence table, which holds only open work times.
+    """
+
+    @swagger_auto_schema(
+        responses={
+            200: openapi.Response(
+                description="OK - work spaces with the employees that have an open work time",
+                schema=WorkSpaceOccupancySerializer(many=True),
+                examples={
+                    "application/json": [
+                        {
+                            "id": "6cb80afa-7627-41d8-b9a0-fc8a60a83696",
+                            "name": "Work space 1",
+                            "count": 1,
+                            "employees": [
+                                {
+                                    "work_time": "d19842a8-2e50-4a8b-aa57-98670b08f58d",
+                                    "employee": {
+                                        "id": "b53a217f-0638-4ce8-ad41-5b824aedafb5",
+                                        "name": "Jan",
+                                        "surname": "Kowalski",
+                                        "phone_number": "123456789",
+                                        "is_active": True,
+                                    },
+                                    "start_date": "2024-01-18T07:58:12.312941Z",
+                                }
+                            ],
+                        }
+                    ]
+                },
+            ),
+        },
+    )
+    @method_decorator(cache_response(model_scopes("worktime", "employee", "workspace")))
+    def get(self, request):
+        work_space = WorkSpace.objects.order_by("name").prefetch_related(
+            Prefetch(
+                "presence",
+                queryset=WorkSpacePresence.objects.select_related("employee").order_by("start_date"),
+            )
+        )
+        serializer = WorkSpaceOccupancySerializer(work_space, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,45 @@
+"""
+Start/end state machine of WorkTime, shared by the sync and async handle_work_time/ views.
+"""
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+
+from .models import WorkSpace, WorkTime
+
+
+def handle_swipe(employee_id, weather_station):
+    """
+    Ends the open WorkTime of the employee at weather_station, or starts a new one there.
+    The open WorkTime is read with a row lock, so concurrent swipes of one employee run
+    one after another. Returns (message, HTTP status).
+    """
+    with transaction.atomic():
+        work_time = (
+            WorkTime.objects.select_for_update(of=("self",))
+            .select_related("work_space")
+            .filter(employee_id=employee_id, end_date=None)
+            .first()
+        )
+        if work_time is not None:
+            if work_time.work_space.end_station_id != weather_station.id:
+                return "ERROR - Can't end WorkTime at this station!", status.HTTP_401_UNAUTHORIZED
+            work_time.end_date = timezone.now()
+            work_time.end_station = weather_station
+            work_time.save(update_fields=["end_date", "end_station"])
+            return "OK - WorkTime ended", status.HTTP_200_OK
+        work_space = WorkSpace.objects.filter(start_station=weather_station).first()
+        if work_space is None:
+            return "ERROR - Can't start WorkTime at this station!", status.HTTP_401_UNAUTHORIZED
+        try:
+            with transaction.atomic():
+                WorkTime.objects.create(
+                    employee_id=employee_id,
+                    start_date=timezone.now(),
+                    start_station=weather_station,
+                    work_space=work_space,
+                )
+        except IntegrityError:
+            return "ERROR - WorkTime already started", status.HTTP_409_CONFLICT
+    return "OK - WorkTime started", status.HTTP_200_OK
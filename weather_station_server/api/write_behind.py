@@ -0,0 +1,184 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import (
+    DatabaseError,
+    IntegrityError,
+    OperationalError,
+    close_old_connections,
+    transaction,
+)
+
+from . import response_cache
+from .ingest import save_weather_data
+from .models import WeatherData
+
+logger = logging.getLogger(__name__)
+
+# Body of the 503 the device endpoints answer with while the queue is full.
+BUSY = {"status": "ERROR - server busy, retry later"}
+
+
+def describe(instance):
+    # The field values, __str__ of the models follows relations that may be unset.
+    values = ", ".join(
+        f"{field.attname}={getattr(instance, field.attname)!r}"
+        for field in instance._meta.concrete_fields
+    )
+    return f"{type(instance).__name__}({values})"
+
+
+class WriteBehindBuffer:
+    """
+    Collects unsaved model instances in memory and persists them with
+    bulk_create from a background thread.
+    A flush happens every flush_interval_ms or as soon as max_rows are queued.
+    Rows were already acknowledged to the devices: a batch that fails because the
+    database is locked or unreachable is queued again as a whole, any other failed
+    batch is retried row by row and rows the database rejects are logged and dropped.
+    At most max_pending rows are queued, append() refuses new rows beyond that so the
+    endpoints can ask the devices to retry later.
+    """
+
+    def __init__(
+        self, flush_interval_ms=250, max_rows=500, max_pending=10000, stop_timeout_ms=5000
+    ):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_rows = max_rows
+        self.max_pending = max_pending
+        self.stop_timeout = stop_timeout_ms / 1000
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._stopped = False
+
+    @property
+    def depth(self):
+        with self._lock:
+            return len(self._pending)
+
+    def append(self, instance):
+        """Queues the instance, returns False when the queue is full."""
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                return False
+            self._pending.append(instance)
+            depth = len(self._pending)
+            stopped = self._stopped
+            if self._thread is None and not stopped:
+                self._start()
+        if stopped:
+            # No flusher thread any more, e.g. during interpreter shutdown.
+            self.flush()
+        elif depth >= self.max_rows:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """Persists everything queued so far and returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return 0
+            try:
+                self._save(pending)
+            except OperationalError:
+                # Locked or unreachable database, retrying row by row would only wait longer.
+                logger.exception("Write-behind flush failed, %d rows queued again", len(pending))
+                self._requeue(pending)
+                return 0
+            except Exception:
+                logger.exception("Write-behind flush failed, retrying %d rows one by one", len(pending))
+                return self._save_one_by_one(pending)
+            return len(pending)
+
+    def _save(self, instances):
+        by_model = {}
+        for instance in instances:
+            by_model.setdefault(type(instance), []).append(instance)
+        with transaction.atomic():
+            for model, instances in by_model.items():
+                if model is WeatherData:
+                    save_weather_data(instances)
+                else:
+                    model.objects.bulk_create(instances)
+                    response_cache.invalidate(model, instances)
+
+    def _save_one_by_one(self, instances):
+        saved = 0
+        retry = []
+        for index, instance in enumerate(instances):
+            try:
+                self._save([instance])
+            except OperationalError:
+                retry.extend(instances[index:])
+                break
+            except DatabaseError as error:
+                if isinstance(error, IntegrityError):
+                    logger.exception("Write-behind row dropped: %s", describe(instance))
+                else:
+                    retry.append(instance)
+            except Exception:
+                logger.exception("Write-behind row dropped: %s", describe(instance))
+            else:
+                saved += 1
+        if retry:
+            logger.error("Write-behind flush failed, %d rows queued again", len(retry))
+            self._requeue(retry)
+        return saved
+
+    def _requeue(self, instances):
+        # Acknowledged rows go back in front of the queue even when it is full.
+        with self._lock:
+            self._pending[:0] = instances
+
+    def stop(self):
+        """
+        Stops the flusher thread and writes out whatever is still queued, retrying
+        until the queue is empty or stop_timeout_ms passed. Rows left after that are lost.
+        """
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        deadline = time.monotonic() + self.stop_timeout
+        self.flush()
+        while self.depth and time.monotonic() < deadline:
+            time.sleep(self.flush_interval)
+            self.flush()
+        with self._lock:
+            dropped, self._pending = self._pending, []
+        if dropped:
+            logger.error("Write-behind buffer stopped, %d rows dropped", len(dropped))
+
+    def _start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="write-behind-flusher", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            close_old_connections()
+
+
+def is_enabled():
+    return settings.WRITE_BEHIND["ENABLED"]
+
+
+buffer = WriteBehindBuffer(
+    flush_interval_ms=settings.WRITE_BEHIND["FLUSH_INTERVAL_MS"],
+    max_rows=settings.WRITE_BEHIND["MAX_ROWS"],
+    max_pending=settings.WRITE_BEHIND["MAX_PENDING"],
+    stop_timeout_ms=settings.WRITE_BEHIND["STOP_TIMEOUT_MS"],
+)
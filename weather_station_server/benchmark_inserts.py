@@ -0,0 +1,79 @@
+"""
+Compares WeatherData insert throughput with random uuid4 and time-ordered UUIDv7 primary keys.
+Every mode fills a fresh SQLite database file and reports the insert rate of the last
+--window rows before every checkpoint, so the slowdown as the table grows is visible:
+
+    python benchmark_inserts.py --rows 1000000 10000000 50000000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "weather_station_server.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DEBUG", "0")
+settings.DATABASES["default"]["NAME"] = os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3")
+django.setup()
+from api.models import WeatherData, WeatherStation
+
+BATCH_SIZE = 5000
+
+
+def insert(weather_station, start, n):
+    now = timezone.now()
+    elapsed = 0.0
+    for offset in range(0, n, BATCH_SIZE):
+        readings = [
+            WeatherData(
+                weather_station=weather_station,
+                temperature=random.uniform(-20, 40),
+                humidity=random.uniform(0, 100),
+                pressure=random.uniform(800, 1200),
+                date=now + timedelta(seconds=start + offset + i),
+            )
+            for i in range(min(BATCH_SIZE, n - offset))
+        ]
+        begin = time.perf_counter()
+        WeatherData.objects.bulk_create(readings)
+        elapsed += time.perf_counter() - begin
+    return elapsed
+
+
+def run(mode, checkpoints, window):
+    settings.TIME_ORDERED_IDS = mode == "uuid7"
+    call_command("flush", interactive=False, verbosity=0)
+    with connection.cursor() as cursor:
+        cursor.execute("VACUUM")
+    weather_station = WeatherStation.objects.create(name="Benchmark")
+    count = 0
+    for checkpoint in checkpoints:
+        if checkpoint - window > count:
+            insert(weather_station, count, checkpoint - window - count)
+            count = checkpoint - window
+        elapsed = insert(weather_station, count, checkpoint - count)
+        rate = (checkpoint - count) / elapsed
+        count = checkpoint
+        size = os.path.getsize(settings.DATABASES["default"]["NAME"]) / 2**20
+        print(f"{mode:<6} {checkpoint:>12,} rows {rate:12,.0f} rows/s {size:10.0f} MiB", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--window", type=int, default=50000)
+    parser.add_argument("--modes", nargs="+", choices=["uuid4", "uuid7"], default=["uuid4", "uuid7"])
+    args = parser.parse_args()
+
+    call_command("migrate", verbosity=0)
+    for mode in args.modes:
+        run(mode, sorted(args.rows), args.window)
@@ -0,0 +1,100 @@
+"""
+Compares the weather_station/<pk>/data/ serialization before and after the lean read path.
+Runs against an in-memory SQLite database, no server or existing data needed:
+
+    python benchmark_serialization.py --rows 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "weather_station_server.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DEBUG", "0")
+settings.DATABASES["default"]["NAME"] = ":memory:"
+django.setup()
+from rest_framework.renderers import JSONRenderer
+
+from api.models import WeatherData, WeatherStation
+from api.renderers import FastJSONRenderer
+from api.rows import weather_data_rows, weather_data_values
+from api.serializers import WeatherDataSerializer, WeatherStationDataSerializer
+
+
+def generate_weather_data(n):
+    weather_station = WeatherStation.objects.create(name="Benchmark")
+    now = timezone.now()
+    WeatherData.objects.bulk_create(
+        (
+            WeatherData(
+                weather_station=weather_station,
+                temperature=random.uniform(-20, 40),
+                humidity=random.uniform(0, 100),
+                pressure=random.uniform(800, 1200),
+                date=now - timedelta(seconds=30 * i),
+            )
+            for i in range(n)
+        ),
+        batch_size=5000,
+    )
+    return weather_station
+
+
+def serialize_before(weather_station):
+    """Per-row ModelSerializer, then the whole payload validated again as the view used to do."""
+    weather_data = WeatherData.objects.filter(weather_station=weather_station).order_by("-date")
+    data = {
+        "station_name": str(weather_station.name),
+        "station_id": str(weather_station.id),
+        "weather_data": WeatherDataSerializer(weather_data, many=True).data,
+    }
+    serializer = WeatherStationDataSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    return JSONRenderer().render(serializer.data)
+
+
+def serialize_after(weather_station):
+    weather_data = WeatherData.objects.filter(weather_station=weather_station).order_by("-date")
+    data = {
+        "station_name": str(weather_station.name),
+        "station_id": str(weather_station.id),
+        "weather_data": weather_data_rows(weather_data_values(weather_data)),
+    }
+    return FastJSONRenderer().render(data)
+
+
+def measure(name, function, weather_station, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = function(weather_station)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{name:<8} {best:8.2f} s {rows / best:12,.0f} rows/s {len(content) / 2**20:8.1f} MiB")
+    return content
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    call_command("migrate", verbosity=0)
+    weather_station = generate_weather_data(args.rows)
+    before = measure("before", serialize_before, weather_station, args.rows, args.repeat)
+    after = measure("after", serialize_after, weather_station, args.rows, args.repeat)
+    # The old view dropped the read-only id of every reading when it validated the payload again.
+    before, after = json.loads(before), json.loads(after)
+    for row in after["weather_data"]:
+        del row["id"]
+    print("same output apart from the restored ids:", before == after)
@@ -1,5 +1,6 @@
 import os
 import django
+from django.core.management import call_command
 from django.utils import timezone
 from faker import Faker
 import random
@@ -8,6 +9,8 @@ from datetime import timedelta
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "weather_station_server.settings")
 django.setup()
+from api.ingest import rebuild_latest_readings
+from api.sharding import shard_for
 fake = Faker("pl_PL")
 
 
@@ -67,7 +70,7 @@ def generate_weather_station_datas(n=3):
                 position=2,
             ):
                 for minute in range(30):
-                    WeatherData.objects.create(
+                    WeatherData.objects.using(shard_for(weather_station.id)).create(
                         weather_station=weather_station,
                         temperature=last_temperature,
                         humidity=last_humidity,
@@ -121,3 +124,5 @@ if __name__ == "__main__":
     generate_weather_stations()
     generate_employee_card_logs()
     generate_weather_station_datas()
+    call_command("rebuild_rollups")
+    rebuild_latest_readings()